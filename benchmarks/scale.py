@@ -0,0 +1,279 @@
+"""Scale benchmarks on synthetic plugin trees and script sets.
+
+Usage: python benchmarks/scale.py --sizes 10,100,1000 --output bench.json
+"""
+
+from viscum import ModuleManager
+from viscum.scripting import ModuleProxy
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+PLUGIN_TEMPLATE = """from viscum.plugin import (Module, ModuleArgument,
+                           ModuleCapabilities)
+from viscum.plugin.prop import ModuleProperty
+from viscum.plugin.method import ModuleMethod
+
+
+class {name}Driver(Module):
+    _module_desc = ModuleArgument('{name}', 'synthetic driver')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _properties = {{'value': ModuleProperty('a value')}}
+    _methods = {{'poke': ModuleMethod('a method')}}
+
+    def __init__(self, *args, **kwargs):
+        super({name}Driver, self).__init__(*args, **kwargs)
+        self._automap_properties()
+        self._automap_methods()
+        self._value = 0
+        kwargs['handler'](self, attach_custom_hook=(
+            'bench.hook', (self.on_hook, None, self._registered_id)))
+        kwargs['handler'](self, attach_manager_hook=(
+            'modman.tick', (self.on_tick, None, self._registered_id)))
+
+    def _get_value(self):
+        return self._value
+
+    def _set_value(self, value):
+        self._value = value
+
+    def _poke(self):
+        self._value += 1
+        return self._value
+
+    def on_hook(self, **kwargs):
+        return False
+
+    def on_tick(self, **kwargs):
+        return False
+
+
+def discover_module(**kwargs):
+    return {name}Driver
+"""
+
+SCRIPT_TEMPLATE = """set_name('bench{index}')
+
+def on_tick(**kwargs):
+    pass
+
+def on_hook(**kwargs):
+    pass
+
+attach_man_hook('modman.tick', on_tick)
+attach_custom_hook('bench.hook', on_hook)
+"""
+
+DEFERRED_SCRIPT_TEMPLATE = """set_name('bench{index}')
+
+require_instance('{type_name}', '{type_name}')
+"""
+
+
+def type_name(index):
+    """Return the name of a synthetic plugin type.
+
+    Args
+    ----
+    index: int
+        Plugin number
+    """
+    return 'synth{}'.format(index)
+
+
+def write_plugin_tree(path, type_count):
+    """Write a synthetic plugin tree.
+
+    Args
+    ----
+    path: str
+        Plugins folder, created if needed
+    type_count: int
+        Number of plugins (one type each)
+    """
+    for index in range(type_count):
+        plugin_dir = os.path.join(path, type_name(index))
+        os.makedirs(plugin_dir)
+        with open(os.path.join(plugin_dir, '__init__.py'), 'w') as f:
+            f.write(PLUGIN_TEMPLATE.format(name=type_name(index)))
+
+
+def write_script_set(path, script_count, type_count, deferred_ratio=4):
+    """Write a synthetic script set.
+
+    One in every deferred_ratio scripts waits on an instance that is
+    only loaded later; the others attach to hooks.
+    Args
+    ----
+    path: str
+        Scripts folder, created if needed
+    script_count: int
+        Number of scripts
+    type_count: int
+        Number of plugin types
+    deferred_ratio: int
+        Ratio of deferred scripts
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    for index in range(script_count):
+        if deferred_ratio and index % deferred_ratio == 0:
+            text = DEFERRED_SCRIPT_TEMPLATE.format(
+                index=index, type_name=type_name(index % type_count))
+        else:
+            text = SCRIPT_TEMPLATE.format(index=index)
+        with open(os.path.join(path, 'bench{}.py'.format(index)), 'w') as f:
+            f.write(text)
+
+
+def _timed(function, *args, **kwargs):
+    """Return the duration of a call, in seconds."""
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _result(total, count):
+    """Build a result entry."""
+    return {'total': total,
+            'count': count,
+            'per_op': total / count if count > 0 else None}
+
+
+def run_scale(type_count, instance_count, script_count, repeat=100):
+    """Run every benchmark on one synthetic tree size.
+
+    Args
+    ----
+    type_count: int
+        Number of plugin types
+    instance_count: int
+        Number of instances, spread over all types
+    script_count: int
+        Number of scripts
+    repeat: int
+        Number of hook triggers, ticks, method calls and proxy accesses
+    """
+    root = tempfile.mkdtemp(prefix='viscum-bench-')
+    plugin_path = os.path.join(root, 'plugins')
+    script_path = os.path.join(root, 'scripts')
+    try:
+        write_plugin_tree(plugin_path, type_count)
+        write_script_set(script_path, script_count, type_count)
+
+        modman = ModuleManager(central_log='bench', plugin_path=plugin_path,
+                               script_path=script_path)
+        results = {}
+        results['discover_modules'] = _result(
+            _timed(modman.discover_modules), type_count)
+
+        modman.install_custom_hook('bench.hook')
+        results['discover_scripts'] = _result(
+            _timed(modman.discover_scripts), script_count)
+
+        instance_names = []
+        start = time.perf_counter()
+        for index in range(instance_count):
+            instance_names.append(
+                modman.load_module(type_name(index % type_count)))
+        results['load_module'] = _result(time.perf_counter() - start,
+                                         instance_count)
+
+        results['trigger_custom_hook'] = _result(
+            _timed(lambda: [modman.trigger_custom_hook('bench.hook')
+                            for _ in range(repeat)]), repeat)
+
+        results['module_system_tick'] = _result(
+            _timed(lambda: [modman.module_system_tick()
+                            for _ in range(repeat)]), repeat)
+
+        targets = [instance_names[index % instance_count]
+                   for index in range(repeat)]
+        results['call_module_method'] = _result(
+            _timed(lambda: [modman.call_module_method(target, 'poke')
+                            for target in targets]), repeat)
+
+        proxies = [ModuleProxy(type_name(index % type_count), modman)
+                   for index in range(repeat)]
+        results['proxy_attribute'] = _result(
+            _timed(lambda: [(proxy.value, proxy.poke())
+                            for proxy in proxies]), repeat)
+
+        start = time.perf_counter()
+        for instance_name in instance_names:
+            modman.unload_module(instance_name)
+        results['unload_module'] = _result(time.perf_counter() - start,
+                                           instance_count)
+
+        return {'types': type_count,
+                'instances': instance_count,
+                'scripts': script_count,
+                'repeat': repeat,
+                'results': results}
+    finally:
+        for index in range(type_count):
+            sys.modules.pop(type_name(index), None)
+        shutil.rmtree(root)
+
+
+def run_benchmarks(sizes, instances=None, scripts=None, repeat=100):
+    """Run the benchmarks for several tree sizes.
+
+    Args
+    ----
+    sizes: list
+        Numbers of plugin types
+    instances: int
+        Number of instances, defaults to the number of types
+    scripts: int
+        Number of scripts, defaults to the number of types
+    repeat: int
+        Number of hook triggers, ticks, method calls and proxy accesses
+    """
+    runs = []
+    for size in sizes:
+        runs.append(run_scale(size,
+                              instances if instances is not None else size,
+                              scripts if scripts is not None else size,
+                              repeat))
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+            'runs': runs}
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000',
+                        help='comma-separated numbers of plugin types')
+    parser.add_argument('--instances', type=int, default=None,
+                        help='number of instances (default: one per type)')
+    parser.add_argument('--scripts', type=int, default=None,
+                        help='number of scripts (default: one per type)')
+    parser.add_argument('--repeat', type=int, default=100,
+                        help='repetitions of per-call benchmarks')
+    parser.add_argument('--output', default=None,
+                        help='JSON output file (default: standard output)')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    report = run_benchmarks([int(size) for size in args.sizes.split(',')],
+                            args.instances, args.scripts, args.repeat)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
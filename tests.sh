@@ -6,4 +6,6 @@ flake8 viscum
 
 #run rests
 echo "Running tests"
-python $(which nosetests) --with-coverage --cover-xml --cover-package=viscum tests/test_args.py
+python $(which nosetests) --with-coverage --cover-xml --cover-package=viscum \
+    tests/test_args.py tests/test_discovery.py tests/test_instances.py \
+    tests/test_aio.py tests/test_benchmarks.py
@@ -0,0 +1,173 @@
+"""asyncio interface test cases."""
+
+from viscum import ModuleManager
+from viscum.aio import AsyncModuleManager
+from viscum.plugin import Module, ModuleArgument, ModuleCapabilities
+from viscum.plugin.prop import ModuleProperty
+from viscum.plugin.method import ModuleMethod
+import asyncio
+import threading
+import time
+
+
+class AsyncDevice(Module):
+    """Module with coroutine properties and methods."""
+
+    _module_desc = ModuleArgument('asyncdev', 'coroutine based')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _properties = {'value': ModuleProperty('a value'),
+                   'plain': ModuleProperty('a synchronous value')}
+    _methods = {'poke': ModuleMethod('a method')}
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncDevice, self).__init__(*args, **kwargs)
+        self._automap_properties()
+        self._automap_methods()
+        self.constructed_in = threading.current_thread()
+        self.ready = False
+        self._value = 0
+
+    async def module_load_async(self):
+        await asyncio.sleep(0)
+        self.ready = True
+
+    async def _get_value(self):
+        await asyncio.sleep(0)
+        return self._value
+
+    async def _set_value(self, value):
+        await asyncio.sleep(0)
+        self._value = value
+
+    def _get_plain(self):
+        return threading.current_thread()
+
+    async def _poke(self):
+        await asyncio.sleep(0)
+        self._value += 1
+        return self._value
+
+
+class BrokenAsyncDevice(Module):
+    """Module whose asynchronous initialization fails."""
+
+    _module_desc = ModuleArgument('brokendev', 'fails to finish loading')
+    _optional_kw = [ModuleArgument('working', 'finish loading')]
+    unloaded = []
+
+    def __init__(self, *args, **kwargs):
+        super(BrokenAsyncDevice, self).__init__(*args, **kwargs)
+        self.working = kwargs.get('working', False)
+        self.interrupt_handler(
+            install_custom_method=('broken.method', self.tick))
+        self.interrupt_handler(
+            install_interrupt_handler=('broken.irq', self.tick))
+        self.interrupt_handler(
+            attach_manager_hook=('modman.tick',
+                                 (self.tick, None, self._registered_id)))
+
+    async def module_load_async(self):
+        if not self.working:
+            raise RuntimeError('device unreachable')
+
+    def module_unload(self):
+        self.unloaded.append(self._registered_id)
+
+    def tick(self, **kwargs):
+        raise AssertionError('instance was not loaded')
+
+
+def test_async_load_failure():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None)
+    modman.insert_module(BrokenAsyncDevice)
+    amodman = AsyncModuleManager(modman)
+
+    async def run():
+        try:
+            await amodman.load_module('brokendev')
+            assert False
+        except RuntimeError:
+            pass
+        assert BrokenAsyncDevice.unloaded == ['brokendev']
+        assert 'brokendev' not in modman.loaded_modules
+        assert 'broken.method' not in modman.custom_methods
+        assert 'broken.irq' not in modman.external_interrupts
+        assert modman.attached_hooks['modman.tick'].attached_callbacks == []
+        assert 'brokendev' not in modman._owner_registrations
+        await amodman.module_system_tick()
+
+        # the name can be used again
+        assert await amodman.load_module('brokendev', working=True) ==\
+            'brokendev'
+
+    asyncio.run(run())
+
+
+def test_async_manager():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None)
+    modman.insert_module(AsyncDevice)
+    amodman = AsyncModuleManager(modman)
+    modman.install_custom_hook('test.hook')
+    calls = []
+
+    async def on_hook(**kwargs):
+        await asyncio.sleep(0)
+        calls.append(('async', kwargs['value']))
+
+    def on_hook_sync(**kwargs):
+        calls.append(('sync', kwargs['value']))
+
+    modman.attach_custom_hook('test.hook', on_hook, None, None)
+    modman.attach_custom_hook('test.hook', on_hook_sync, None, None)
+
+    async def run():
+        name = await amodman.load_module('asyncdev')
+        instance = modman.loaded_modules[name]
+        assert instance.ready
+        assert instance.constructed_in is not threading.current_thread()
+
+        assert await amodman.set_module_property(name, 'value', 5) ==\
+            {'status': 'ok'}
+        assert await amodman.get_module_property(name, 'value') == 5
+        assert await amodman.call_module_method(name, 'poke') == 6
+        assert await amodman.get_module_property(name, 'plain') is not\
+            threading.current_thread()
+        assert (await amodman.call_module_method(name, 'poke', x=1))['error']\
+            == 'call_failed'
+        assert (await amodman.get_module_property('x', 'value'))['error']\
+            == 'invalid_instance'
+
+        # callbacks are called one after the other, in attachment order
+        await amodman.trigger_custom_hook('test.hook', value=1)
+        assert calls == [('async', 1), ('sync', 1)]
+
+        # coroutines returned to synchronous triggers run on the loop
+        modman.trigger_custom_hook('test.hook', value=2)
+        await asyncio.sleep(0.1)
+        assert sorted(calls[2:]) == [('async', 2), ('sync', 2)]
+
+        await amodman.unload_module(name)
+        assert name not in modman.loaded_modules
+
+    asyncio.run(run())
+
+
+def test_async_tick_finishes_background_loads():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None)
+    modman.insert_module(AsyncDevice)
+    amodman = AsyncModuleManager(modman)
+
+    async def run():
+        future = modman.submit_load_module('asyncdev')
+        deadline = time.time() + 5
+        while len(modman._finished_loads) == 0:
+            assert time.time() < deadline
+            await asyncio.sleep(0.01)
+        assert not future.done()
+        await amodman.module_system_tick()
+        assert future.result(timeout=0) in modman.loaded_modules
+
+    asyncio.run(run())
@@ -0,0 +1,22 @@
+"""Benchmark suite smoke test."""
+
+import importlib.util
+import json
+import os
+
+_spec = importlib.util.spec_from_file_location(
+    'scale', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          os.pardir, 'benchmarks', 'scale.py'))
+scale = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(scale)
+
+
+def test_scale_benchmarks():
+    report = scale.run_benchmarks([5], instances=8, scripts=8, repeat=4)
+    json.dumps(report)
+    run = report['runs'][0]
+    assert (run['types'], run['instances'], run['scripts']) == (5, 8, 8)
+    assert sorted(run['results']) == sorted([
+        'discover_modules', 'discover_scripts', 'load_module',
+        'unload_module', 'trigger_custom_hook', 'module_system_tick',
+        'call_module_method', 'proxy_attribute'])
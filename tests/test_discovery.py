@@ -0,0 +1,549 @@
+"""Plugin discovery test cases."""
+
+from viscum import ModuleManager
+from viscum.plugin import Module
+from viscum.plugin.stub import ModuleStub
+import tempfile
+import json
+import sys
+import shutil
+import os
+
+PLUGIN_ROOT = """import os
+import glob
+import re
+
+MODULE_NAME_REGEX = re.compile(r'.*\\/([a-zA-Z0-9_]+)\\/__init__\\.py$')
+MODULE_LIST = sorted(glob.glob(os.path.dirname(__file__) +
+                               '/[a-zA-z0-9_]*/__init__.py'))
+MODULES = []
+for module_file in MODULE_LIST:
+    m = MODULE_NAME_REGEX.match(module_file)
+    if m is not None:
+        MODULES.append(m.group(1))
+"""
+
+PLUGIN_TEMPLATE = """from viscum.plugin import Module, ModuleArgument
+
+
+class {name}Driver(Module):
+    _module_desc = ModuleArgument('{name}', '{name} driver')
+
+
+def discover_module(**kwargs):
+    for required in {requires}:
+        kwargs['modman'].require_discovered_module(required)
+    return {name}Driver
+"""
+
+HOOK_PLUGIN = """from viscum.plugin import Module, ModuleArgument
+
+
+class HookDriver(Module):
+    _module_desc = ModuleArgument('lazyhook', 'hook driver')
+
+    @classmethod
+    def hook(cls, **kwargs):
+        return False
+
+
+def discover_module(**kwargs):
+    kwargs['modman'].attach_custom_hook('lazy.hook', HookDriver.hook,
+                                        None, HookDriver)
+    return HookDriver
+"""
+
+
+def make_plugin_tree(plugins):
+    """Write a plugin tree, plugins maps names to required module types."""
+    path = tempfile.mkdtemp()
+    with open(os.path.join(path, '__init__.py'), 'w') as f:
+        f.write(PLUGIN_ROOT)
+
+    for name, requires in plugins.items():
+        write_plugin(path, name, requires)
+
+    return path
+
+
+def write_plugin(path, name, requires=()):
+    """Write (or overwrite) a single plugin."""
+    plugin_dir = os.path.join(path, name)
+    if not os.path.isdir(plugin_dir):
+        os.mkdir(plugin_dir)
+    with open(os.path.join(plugin_dir, '__init__.py'), 'w') as f:
+        f.write(PLUGIN_TEMPLATE.format(name=name, requires=list(requires)))
+
+
+def test_parallel_discovery():
+    plugins = {'alpha': [], 'beta': ['gamma'], 'gamma': [],
+               'delta': ['alpha'], 'broken': ['missing']}
+    path = make_plugin_tree(plugins)
+    try:
+        serial = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        serial.discover_modules()
+
+        parallel = ModuleManager(central_log='test', plugin_path=path,
+                                 script_path=None)
+        parallel.discover_modules(parallel=True, max_workers=4)
+
+        assert list(parallel.found_modules) == list(serial.found_modules)
+        assert sorted(parallel.found_modules) == ['alpha', 'beta',
+                                                  'delta', 'gamma']
+        assert list(parallel.deferred_discoveries) == ['broken']
+    finally:
+        shutil.rmtree(path)
+
+
+TYPED_PLUGIN = """from viscum.plugin import Module, ModuleArgument
+from viscum.plugin.dtype import ModuleDataTypes
+
+
+class TypedDriver(Module):
+    _module_desc = ModuleArgument('typed', 'typed driver')
+    _optional_kw = [ModuleArgument('port', 'port', ModuleDataTypes.INT),
+                    ModuleArgument('modes', 'modes', default=set())]
+
+
+def discover_module(**kwargs):
+    return TypedDriver
+"""
+
+
+def test_lazy_discovery_uncacheable():
+    path = make_plugin_tree({})
+    os.mkdir(os.path.join(path, 'typed'))
+    with open(os.path.join(path, 'typed', '__init__.py'), 'w') as f:
+        f.write(TYPED_PLUGIN)
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.discover_modules(lazy=True, max_workers=2)
+
+        # entries that cannot be stored whole are discovered by import
+        assert not isinstance(modman.found_modules['typed'], ModuleStub)
+        assert modman.found_modules['typed'].get_module_info() is not None
+        assert modman.load_modules([('typed', {'port': 'x'})])[0]['error']\
+            == 'invalid_argument'
+    finally:
+        shutil.rmtree(path)
+
+
+def test_discovery_manifest():
+    path = make_plugin_tree({'alpha': [], 'beta': ['alpha']})
+    manifest = os.path.join(path, 'manifest.json')
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None, manifest_path=manifest)
+        modman.discover_modules()
+        assert not isinstance(modman.found_modules['alpha'], ModuleStub)
+
+        # unchanged plugins are not imported again
+        sys.modules.pop('alpha', None)
+        sys.modules.pop('beta', None)
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None, manifest_path=manifest)
+        modman.discover_modules()
+        assert isinstance(modman.found_modules['alpha'], ModuleStub)
+        assert isinstance(modman.found_modules['beta'], ModuleStub)
+        assert 'alpha' not in sys.modules
+        assert modman.get_module_info('beta')['module_type'] == 'beta'
+        assert modman.get_module_capabilities('beta') == []
+        assert 'beta' in modman.list_discovered_modules()
+
+        # imported on first load
+        instance_name = modman.load_module('beta')
+        assert 'beta' in sys.modules
+        assert isinstance(modman.loaded_modules[instance_name], Module)
+        assert not isinstance(modman.found_modules['beta'], ModuleStub)
+
+        # changed plugins are imported again
+        with open(os.path.join(path, 'alpha', '__init__.py'), 'a') as f:
+            f.write('# changed\n')
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None, manifest_path=manifest)
+        modman.discover_modules()
+        assert not isinstance(modman.found_modules['alpha'], ModuleStub)
+        assert isinstance(modman.found_modules['beta'], ModuleStub)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_manifest_skips_hashing():
+    path = make_plugin_tree({})
+    os.mkdir(os.path.join(path, 'lazyhook'))
+    with open(os.path.join(path, 'lazyhook', '__init__.py'), 'w') as f:
+        f.write(HOOK_PLUGIN)
+    manifest = os.path.join(path, 'manifest.json')
+    try:
+        hashed = []
+        for _ in range(3):
+            sys.modules.pop('lazyhook', None)
+            modman = ModuleManager(central_log='test', plugin_path=path,
+                                   script_path=None, manifest_path=manifest)
+            modman.install_custom_hook('lazy.hook')
+            plugin_hash = modman.plugin_source.hash
+
+            def counting_hash(plugin, plugin_hash=plugin_hash):
+                hashed.append(plugin)
+                return plugin_hash(plugin)
+
+            modman.plugin_source.hash = counting_hash
+            modman.discover_modules()
+            assert not isinstance(modman.found_modules['lazyhook'],
+                                  ModuleStub)
+
+        # not cacheable, imported every time but only hashed once
+        assert hashed == ['lazyhook']
+    finally:
+        shutil.rmtree(path)
+
+
+def test_deferred_discovery_chain():
+    # each plugin requires the next one, so all but the last get deferred
+    chain_length = 400
+    plugins = dict([('p{:04d}'.format(i), ['p{:04d}'.format(i + 1)])
+                    for i in range(chain_length)])
+    plugins['p{:04d}'.format(chain_length)] = []
+    # depends on both ends of the chain
+    plugins['zmulti'] = ['p0000', 'p0200', 'missing']
+    plugins['ymulti'] = ['p0000', 'p0200']
+    path = make_plugin_tree(plugins)
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.discover_modules()
+
+        assert len(modman.found_modules) == chain_length + 2
+        assert modman.deferred_discoveries == {'zmulti': ['missing']}
+    finally:
+        shutil.rmtree(path)
+
+
+def test_lazy_discovery():
+    path = make_plugin_tree({'lazyone': [], 'lazytwo': ['lazyone']})
+    os.mkdir(os.path.join(path, 'lazyhook'))
+    with open(os.path.join(path, 'lazyhook', '__init__.py'), 'w') as f:
+        f.write(HOOK_PLUGIN)
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.install_custom_hook('lazy.hook')
+        modman.discover_modules(lazy=True, max_workers=2)
+
+        assert isinstance(modman.found_modules['lazyone'], ModuleStub)
+        assert isinstance(modman.found_modules['lazytwo'], ModuleStub)
+        assert 'lazyone' not in sys.modules
+        assert 'lazytwo' not in sys.modules
+
+        # uses the manager while discovered, so imported right away
+        assert not isinstance(modman.found_modules['lazyhook'], ModuleStub)
+        assert len(modman.custom_hooks['lazy.hook'].attached_callbacks) == 1
+
+        instance_name = modman.load_module('lazytwo')
+        assert 'lazytwo' in sys.modules
+        assert isinstance(modman.loaded_modules[instance_name], Module)
+        assert modman._plugin_discovery_info['lazytwo'] ==\
+            {'cacheable': True, 'requires': ['lazyone']}
+
+        # plugins imported on demand are reloaded like the others
+        with open(os.path.join(path, 'lazytwo', '__init__.py'), 'a') as f:
+            f.write('# changed\n')
+        assert modman.rediscover(reload_instances=True)['modified'] ==\
+            ['lazytwo']
+        assert instance_name in modman.loaded_modules
+    finally:
+        shutil.rmtree(path)
+
+
+def test_rediscover():
+    path = make_plugin_tree({'hotone': [], 'hottwo': [],
+                             'hotdep': ['hotnew']})
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.discover_modules()
+        instance_name = modman.load_module('hotone',
+                                           instance_name='living_room')
+        old_class = modman.found_modules['hotone']
+
+        assert modman.rediscover() == {'added': [], 'removed': [],
+                                       'modified': []}
+
+        with open(os.path.join(path, 'hotone', '__init__.py'), 'a') as f:
+            f.write('# changed\n')
+        shutil.rmtree(os.path.join(path, 'hottwo'))
+        write_plugin(path, 'hotnew')
+
+        modman.watch_plugins(1, reload_instances=True)
+        modman.module_system_tick()
+
+        assert sorted(modman.found_modules) == ['hotdep', 'hotnew', 'hotone']
+        assert modman.found_modules['hotone'] is not old_class
+        assert isinstance(modman.loaded_modules[instance_name],
+                          modman.found_modules['hotone'])
+    finally:
+        shutil.rmtree(path)
+
+
+MULTI_PLUGIN = """from viscum.plugin import (Module, ModuleArgument,
+                           ModuleCapabilities)
+
+
+class HotDriver(Module):
+    _module_desc = ModuleArgument('hot', 'hot driver')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+
+
+def discover_module(**kwargs):
+    return HotDriver
+"""
+
+
+def test_rediscover_keeps_names():
+    path = make_plugin_tree({})
+    os.mkdir(os.path.join(path, 'hot'))
+    plugin_file = os.path.join(path, 'hot', '__init__.py')
+    with open(plugin_file, 'w') as f:
+        f.write(MULTI_PLUGIN)
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.discover_modules()
+        names = [modman.load_module('hot') for _ in range(3)]
+        assert names == ['hot', 'hot-1', 'hot-2']
+
+        with open(plugin_file, 'a') as f:
+            f.write('# changed\n')
+        assert modman.rediscover(reload_instances=True)['modified'] ==\
+            ['hot']
+        assert sorted(modman.loaded_modules) == names
+        assert modman.load_module('hot') == 'hot-3'
+    finally:
+        shutil.rmtree(path)
+
+
+def test_startup_report():
+    modman = ModuleManager(central_log='test',
+                           plugin_path=os.path.join('tests', 'plugins'),
+                           script_path=os.path.join('tests', 'scripts'),
+                           profile=True)
+    modman.discover_modules()
+    modman.discover_scripts()
+
+    report = modman.get_startup_report(slowest=3)
+    phases = set(span['phase'] for span in report['spans'])
+    assert set(['import', 'discover', 'descriptor',
+                'script', 'script_sanitize']) <= phases
+    assert len(report['slowest']) == 3
+    assert report['wall_time'] >= report['slowest'][0]['duration']
+    assert [deferral['plugin'] for deferral
+            in report['deferrals']] == ['hbusdummy']
+
+    descriptor = [span for span in report['spans']
+                  if span['phase'] == 'descriptor'][0]
+    assert descriptor['parent'][0] == 'discover'
+
+    handle, filename = tempfile.mkstemp()
+    os.close(handle)
+    try:
+        modman.dump_startup_report(filename)
+        with open(filename) as f:
+            assert json.load(f)['wall_time'] == report['wall_time']
+    finally:
+        os.remove(filename)
+
+
+def test_plugin_pack():
+    from viscum.discovery import PluginDirectory
+    from viscum.pack import build_plugin_pack
+
+    path = make_plugin_tree({'packone': [], 'packtwo': ['packone']})
+    with open(os.path.join(path, 'packone', 'helper.py'), 'w') as f:
+        f.write('HELPER = True\n')
+    with open(os.path.join(path, 'packone', '__init__.py'), 'a') as f:
+        f.write('import os\n'
+                'from viscum.plugin.util import load_plugin_component\n'
+                'load_plugin_component(os.path.dirname(__file__), '
+                '"helper")\n')
+    handle, manifest_file = tempfile.mkstemp()
+    os.close(handle)
+    os.remove(manifest_file)
+    pack_file = os.path.join(path, 'plugins.zip')
+    try:
+        build_plugin_pack(PluginDirectory(path), pack_file)
+        build_plugin_pack(PluginDirectory(os.path.join('tests', 'plugins')),
+                          pack_file + '.tests')
+
+        for _ in range(2):
+            modman = ModuleManager(central_log='test', plugin_path=pack_file,
+                                   script_path=None,
+                                   manifest_path=manifest_file)
+            modman.discover_modules()
+            assert sorted(modman.found_modules) == ['packone', 'packtwo']
+        assert isinstance(modman.found_modules['packone'], ModuleStub)
+        instance_name = modman.load_module('packone')
+        assert isinstance(modman.loaded_modules[instance_name], Module)
+        assert sys.modules['helper'].HELPER
+
+        directory = ModuleManager(central_log='test',
+                                  plugin_path=os.path.join('tests',
+                                                           'plugins'),
+                                  script_path=None)
+        directory.discover_modules()
+        packed = ModuleManager(central_log='test',
+                               plugin_path=pack_file + '.tests',
+                               script_path=None)
+        packed.discover_modules()
+        assert sorted(packed.found_modules) ==\
+            sorted(directory.found_modules)
+        for module_type, module_class in packed.found_modules.items():
+            assert module_class.dump_module_structure() ==\
+                directory.found_modules[module_type].dump_module_structure()
+    finally:
+        shutil.rmtree(path)
+        if os.path.exists(manifest_file):
+            os.remove(manifest_file)
+
+
+def test_plugin_roots():
+    local = make_plugin_tree({'rootshared': [], 'rootlocal': []})
+    vendor = make_plugin_tree({'rootshared': [], 'rootvendor': []})
+    # plugin trees do not need to list their plugins
+    os.remove(os.path.join(vendor, '__init__.py'))
+    with open(os.path.join(local, 'rootshared', '__init__.py'), 'a') as f:
+        f.write('LOCAL = True\n')
+    try:
+        modman = ModuleManager(central_log='test',
+                               plugin_path=[local, vendor],
+                               script_path=None)
+        modman.discover_modules()
+        assert sorted(modman.found_modules) == ['rootlocal', 'rootshared',
+                                                'rootvendor']
+        assert sys.modules['rootshared'].LOCAL
+        assert modman.plugin_source.plugin_path('rootvendor') ==\
+            os.path.join(vendor, 'rootvendor')
+        assert list(modman.plugin_source.shadowed) == ['rootshared']
+    finally:
+        shutil.rmtree(local)
+        shutil.rmtree(vendor)
+
+
+SNAPSHOT_PLUGIN = """from viscum.plugin import (Module, ModuleArgument,
+                           ModuleCapabilities)
+
+
+class SnapDriver(Module):
+    _module_desc = ModuleArgument('snapped', 'snapshot driver')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _required_kw = [ModuleArgument('address', 'device address')]
+
+
+def discover_module(**kwargs):
+    return SnapDriver
+"""
+
+
+def test_snapshot_restore():
+    path = make_plugin_tree({'snapbase': [], 'snapidle': []})
+    os.mkdir(os.path.join(path, 'snapped'))
+    with open(os.path.join(path, 'snapped', '__init__.py'), 'w') as f:
+        f.write(SNAPSHOT_PLUGIN)
+    handle, filename = tempfile.mkstemp()
+    os.close(handle)
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.discover_modules()
+        modman.load_module('snapbase')
+        modman.load_module('snapped', address=1)
+        modman._load_module('snapped', loaded_by='snapbase', address=2,
+                            callback=lambda: None)
+        modman.unload_module('snapped')
+        modman._defer_script('wait.py', ['snapped-9'])
+        modman.snapshot(filename)
+
+        restored = ModuleManager(central_log='test', plugin_path=path,
+                                 script_path=None)
+        assert restored.restore(filename) == ['snapbase', 'snapped-1']
+        assert isinstance(restored.found_modules['snapidle'], ModuleStub)
+        instance = restored.loaded_modules['snapped-1']
+        assert instance.get_loaded_kwargs('address') == 2
+        assert instance.get_loaded_kwargs('loaded_by') == 'snapbase'
+        assert instance.get_loaded_kwargs('callback') is None
+        assert restored.deferred_scripts == {'wait.py': ['snapped-9']}
+    finally:
+        shutil.rmtree(path)
+        os.remove(filename)
+
+
+TREE_PLUGIN = """from viscum.plugin import (Module, ModuleArgument,
+                           ModuleCapabilities)
+
+
+class SnapTree(Module):
+    _module_desc = ModuleArgument('snaptree', 'loads a leaf')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+
+    def __init__(self, *args, **kwargs):
+        super(SnapTree, self).__init__(*args, **kwargs)
+        self.interrupt_handler(load_module=('snapleaf', {}))
+
+
+def discover_module(**kwargs):
+    return SnapTree
+"""
+
+LEAF_PLUGIN = """from viscum.plugin import (Module, ModuleArgument,
+                           ModuleCapabilities)
+
+
+class SnapLeaf(Module):
+    _module_desc = ModuleArgument('snapleaf', 'loaded by a tree')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+
+
+def discover_module(**kwargs):
+    return SnapLeaf
+"""
+
+
+def test_snapshot_restore_tree():
+    path = make_plugin_tree({})
+    for name, source in [('snaptree', TREE_PLUGIN),
+                         ('snapleaf', LEAF_PLUGIN)]:
+        os.mkdir(os.path.join(path, name))
+        with open(os.path.join(path, name, '__init__.py'), 'w') as f:
+            f.write(source)
+    handle, filename = tempfile.mkstemp()
+    os.close(handle)
+    script = os.path.join('tests', 'scripts', 'hello.py')
+    try:
+        modman = ModuleManager(central_log='test', plugin_path=path,
+                               script_path=None)
+        modman.discover_modules()
+        modman.load_module('snapleaf')
+        assert modman.load_module('snaptree') == 'snaptree'
+        assert modman.load_module('snaptree') == 'snaptree-1'
+        modman.unload_module('snapleaf')
+        assert sorted(modman.loaded_modules) ==\
+            ['snapleaf-1', 'snapleaf-2', 'snaptree', 'snaptree-1']
+        modman._defer_script(script, ['snaptree-1'])
+        modman.snapshot(filename)
+
+        restored = ModuleManager(central_log='test', plugin_path=path,
+                                 script_path=None)
+        # leaves are loaded again by the trees, not restored
+        assert restored.restore(filename) == ['snaptree', 'snaptree-1']
+        assert sorted(restored.loaded_modules) ==\
+            ['snapleaf', 'snapleaf-1', 'snaptree', 'snaptree-1']
+        assert restored._allocated_suffixes['snaptree-1'] == ('snaptree', 1)
+        assert restored.load_module('snaptree') == 'snaptree-2'
+
+        # the script waiting on a restored instance ran
+        assert restored.deferred_scripts == {}
+        assert script in restored.scripts
+    finally:
+        shutil.rmtree(path)
+        os.remove(filename)
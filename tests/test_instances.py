@@ -0,0 +1,692 @@
+"""Instance management test cases."""
+
+from viscum import ModuleManager, HookAttacher, handle_multiple_instance
+from viscum.hook import ModuleManagerHook
+from viscum.exception import MethodNotAvailableError
+from viscum.plugin import Module, ModuleArgument, ModuleCapabilities
+from viscum.plugin.exception import ModuleLoadError, ModuleNotLoadedError
+from viscum.plugin.prop import ModuleProperty
+from viscum.plugin.method import ModuleMethod, ModuleMethodArgument
+from viscum.plugin.dtype import ModuleDataTypes
+from viscum.scripting import ModuleProxy
+import os
+import shutil
+import tempfile
+import threading
+import time
+import concurrent.futures
+import gc
+
+
+class MultiModule(Module):
+    """Module allowing several instances."""
+
+    _module_desc = ModuleArgument('multi', 'multiple instances')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+
+
+class SingleModule(Module):
+    """Module allowing a single instance."""
+
+    _module_desc = ModuleArgument('single', 'single instance')
+
+
+def make_manager():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None)
+    modman.insert_module(MultiModule)
+    modman.insert_module(SingleModule)
+    return modman
+
+
+def test_instance_index():
+    modman = make_manager()
+    assert modman.get_instance_list_by_type('multi') == []
+
+    names = [modman.load_module('multi') for _ in range(3)]
+    modman.load_module('single')
+    assert modman.get_instance_list_by_type('multi') == names
+    assert modman.get_instance_list_by_type('single') == ['single']
+    assert ModuleProxy('multi__1',
+                       modman).get_available_instances() == names
+
+    modman.unload_module(names[1])
+    assert modman.get_instance_list_by_type('multi') == [names[0], names[2]]
+    modman.unload_module('single')
+    assert modman.get_instance_list_by_type('single') == []
+    assert not modman._is_module_type_present('single')
+    modman.load_module('single')
+
+
+class RegexModule(Module):
+    """Module whose type contains regular expression metacharacters."""
+
+    _module_desc = ModuleArgument('a.b', 'dotted type')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+
+
+def test_instance_suffixes():
+    modman = make_manager()
+    modman.insert_module(RegexModule)
+    names = [modman.load_module('multi') for _ in range(3)]
+    assert names == ['multi', 'multi-1', 'multi-2']
+
+    # suffixes keep counting up after unloads
+    modman.unload_module('multi-2')
+    assert modman.load_module('multi') == 'multi-3'
+    # explicitly suffixed instances are skipped
+    modman.load_module('multi', instance_suffix=4)
+    assert modman.load_module('multi') == 'multi-5'
+
+    # type names are not patterns
+    modman.load_module('a.b')
+    modman.load_module('a.b', instance_name='axb', instance_suffix=7)
+    assert modman.load_module('a.b') == 'a.b-1'
+
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None, reuse_instance_suffixes=True)
+    modman.insert_module(MultiModule)
+    names = [modman.load_module('multi') for _ in range(4)]
+    modman.unload_module('multi-3')
+    modman.unload_module('multi-1')
+    assert modman.load_module('multi') == 'multi-1'
+    assert modman.load_module('multi') == 'multi-3'
+    assert modman.load_module('multi') == 'multi-4'
+
+
+WAITING_SCRIPT = """set_name('waiting')
+
+def get_instances():
+    return multi__1, single
+"""
+
+
+def test_deferred_script_wake_up():
+    script_path = tempfile.mkdtemp()
+    script = os.path.join(script_path, 'waiting.py')
+    with open(script, 'w') as f:
+        f.write(WAITING_SCRIPT)
+    try:
+        modman = make_manager()
+        modman.script_path = script_path
+        modman.discover_scripts()
+        assert modman.deferred_scripts == {script: ['multi-1', 'single']}
+
+        modman.load_module('single')
+        modman.load_module('multi')
+        assert script not in modman.scripts
+        modman.load_module('multi')
+        assert script in modman.scripts
+        assert modman.deferred_scripts == {}
+        assert modman._deferred_by_instance == {}
+    finally:
+        shutil.rmtree(script_path)
+
+
+class ArgumentModule(Module):
+    """Module with a required argument."""
+
+    _module_desc = ModuleArgument('argument', 'required argument')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _required_kw = [ModuleArgument('address', 'an address')]
+
+
+def test_load_modules():
+    modman = make_manager()
+    modman.insert_module(ArgumentModule)
+    seen = []
+
+    def loaded(instance_name, **kwargs):
+        seen.append((instance_name, len(modman.loaded_modules)))
+
+    modman.attach_manager_hook('modman.module_loaded', loaded, None, None)
+    results = modman.load_modules(['multi', 'single', 'single', 'missing',
+                                   ('argument', {}),
+                                   ('argument', {'address': 1}), 'multi'])
+    assert [result['status'] for result in results] ==\
+        ['ok', 'ok', 'error', 'error', 'error', 'ok', 'ok']
+    assert [result.get('error') for result in results[2:5]] ==\
+        ['already_loaded', 'invalid_module', 'missing_argument']
+    assert [result.get('instance') for result in results] ==\
+        ['multi', 'single', None, None, None, 'argument', 'multi-1']
+    # hooks are triggered once everything is loaded
+    assert seen == [(name, 4) for name in ['multi', 'single',
+                                           'argument', 'multi-1']]
+
+
+class SlowModule(Module):
+    """Module with a slow constructor."""
+
+    _module_desc = ModuleArgument('slow', 'slow constructor')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _optional_kw = [ModuleArgument('fail', 'raise from constructor'),
+                    ModuleArgument('delay', 'constructor duration')]
+
+    def __init__(self, *args, **kwargs):
+        super(SlowModule, self).__init__(*args, **kwargs)
+        time.sleep(kwargs.get('delay', 0.2))
+        if kwargs.get('fail'):
+            raise RuntimeError('device unreachable')
+
+
+def test_concurrent_load():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None, load_workers=8)
+    modman.insert_module(SlowModule)
+
+    start = time.time()
+    futures = [modman.submit_load_module('slow') for _ in range(4)]
+    futures.append(modman.submit_load_module('slow', fail=True))
+    # workers only construct, registration waits for the manager thread
+    concurrent.futures.wait(futures, timeout=0.4)
+    assert not any(future.done() for future in futures)
+    assert modman.list_loaded_modules() == {}
+    assert sorted(modman.finish_background_loads(wait=True)) ==\
+        ['slow', 'slow-1', 'slow-2', 'slow-3']
+    assert time.time() - start < 0.8
+    assert all(future.done() for future in futures)
+    assert sorted(future.result() for future in futures[:4]) ==\
+        ['slow', 'slow-1', 'slow-2', 'slow-3']
+    assert isinstance(futures[4].exception(), RuntimeError)
+    assert sorted(modman.loaded_modules) == ['slow', 'slow-1', 'slow-2',
+                                             'slow-3']
+
+    start = time.time()
+    results = modman.load_modules(['slow'] * 4 + [('slow', {'fail': True})],
+                                  concurrent=True)
+    assert time.time() - start < 0.6
+    assert [result['status'] for result in results] == ['ok'] * 4 +\
+        ['error']
+    assert len(modman.get_instance_list_by_type('slow')) == 8
+
+    # the main loop registers background loads on each tick
+    future = modman.submit_load_module('slow')
+    time.sleep(0.4)
+    assert not future.done()
+    modman.module_system_tick()
+    assert future.result(timeout=0) in modman.loaded_modules
+
+
+class StandbyModule(Module):
+    """Module preparing standby state ahead of loads."""
+
+    _module_desc = ModuleArgument('standby', 'standby pool')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    prepared = []
+
+    @classmethod
+    def module_standby(cls):
+        cls.prepared.append(None)
+        return len(cls.prepared)
+
+
+def test_standby_pool():
+    modman = make_manager()
+    modman.insert_module(StandbyModule)
+    try:
+        modman.configure_standby_pool('single', 1)
+        assert False
+    except ModuleLoadError:
+        pass
+
+    modman.configure_standby_pool('standby', 2)
+    deadline = time.time() + 5
+    while modman.get_standby_pool_status('standby')['ready'] < 2:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+    names = [modman.load_module('standby') for _ in range(3)]
+    standbys = [modman.loaded_modules[name]._standby for name in names]
+    # the third load may or may not find a refilled pool
+    assert standbys[:2] == [1, 2]
+    assert 'standby' not in modman.loaded_modules[names[0]]._loaded_kwargs
+
+    # the pool refills in the background
+    while modman.get_standby_pool_status('standby')['ready'] < 2:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+    modman.configure_standby_pool('standby', 0)
+    assert modman.get_standby_pool_status('standby') ==\
+        {'size': 0, 'ready': 0}
+    assert modman.loaded_modules[modman.load_module('standby')]._standby\
+        is None
+
+
+def test_load_budget():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None, load_workers=4)
+    modman.insert_module(SlowModule)
+    ready = []
+
+    def module_ready(instance_name, status, **kwargs):
+        ready.append((instance_name, status, threading.current_thread()))
+
+    modman.attach_manager_hook('modman.module_ready', module_ready,
+                               None, None)
+
+    # constructor finishing within budget
+    assert modman.load_module('slow', load_budget=1) == 'slow'
+    assert 'slow' in modman.loaded_modules
+
+    # another thread loading inline does not hold up budgeted loads
+    competing = threading.Thread(target=modman.load_module,
+                                 args=('slow',), kwargs={'delay': 1.0})
+    competing.start()
+    while not modman.is_instance_pending('slow-1'):
+        time.sleep(0.01)
+
+    modman.set_load_budget('slow', 0.05)
+    start = time.time()
+    name = modman.load_module('slow')
+    failing = modman.load_module('slow', fail=True)
+    assert time.time() - start < 0.3
+    assert modman.is_instance_pending(name)
+    assert name not in modman.loaded_modules
+
+    # completion is delivered by the manager thread
+    time.sleep(0.4)
+    assert ready == []
+    modman.finish_background_loads(wait=True)
+    current = threading.current_thread()
+    assert sorted(ready) == sorted([(name, 'ok', current),
+                                    (failing, 'error', current)])
+    assert name in modman.loaded_modules
+    assert not modman.is_instance_pending(failing)
+    assert failing not in modman.loaded_modules
+    competing.join()
+    assert 'slow-1' in modman.loaded_modules
+
+
+class CounterModule(Module):
+    """Module with mapped properties and methods."""
+
+    _module_desc = ModuleArgument('counter', 'counter')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _properties = {'count': ModuleProperty('the count')}
+    _methods = {'bump': ModuleMethod('bump the count')}
+
+    def __init__(self, *args, **kwargs):
+        super(CounterModule, self).__init__(*args, **kwargs)
+        self._automap_properties()
+        self._automap_methods()
+        self._count = 0
+
+    def _get_count(self):
+        return self._count
+
+    def _bump(self, **kwargs):
+        self._count += kwargs.get('step', 1)
+        return self._count
+
+
+def test_bound_descriptors():
+    modman = make_manager()
+    modman.insert_module(CounterModule)
+    first = modman.load_module('counter')
+    second = modman.load_module('counter')
+    assert modman.call_module_method(first, 'bump') == 1
+    assert modman.get_module_property(first, 'count') == 1
+    assert modman.get_module_property(second, 'count') == 0
+
+    # class-level descriptors are shared and left untouched
+    instance = modman.loaded_modules[first]
+    assert instance._methods['bump'].descriptor is\
+        CounterModule._methods['bump']
+    assert CounterModule._methods['bump'].method_call is None
+    assert CounterModule._properties['count'].getter is None
+    assert instance._properties['count'].property_desc == 'the count'
+
+    instance._methods['bump'].add_arguments(
+        {'step': ModuleMethodArgument('step', required=False)})
+    assert modman.call_module_method(first, 'bump', step=2) == 3
+    assert CounterModule._methods['bump'].method_args == {}
+    assert modman.call_module_method(second, 'bump',
+                                     step=2)['error'] == 'call_failed'
+
+    # other attributes can still be set on a binding, for itself only
+    instance._properties['count'].property_desc = 'the first count'
+    instance._methods['bump'].method_desc = 'bump the first count'
+    assert instance._properties['count'].property_desc == 'the first count'
+    assert CounterModule._properties['count'].property_desc == 'the count'
+    second_instance = modman.loaded_modules[second]
+    assert second_instance._methods['bump'].method_desc == 'bump the count'
+
+
+class TypedModule(Module):
+    """Module with typed and strictly checked arguments."""
+
+    _module_desc = ModuleArgument('typed', 'typed arguments')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _required_kw = [ModuleArgument('port', 'port number', ModuleDataTypes.INT)]
+    _optional_kw = [ModuleArgument('hosts', 'host names',
+                                   ModuleDataTypes.STRING_LIST, ['local'])]
+    _strict_kw = True
+
+
+def test_argument_validation():
+    modman = make_manager()
+    modman.insert_module(TypedModule)
+    results = modman.load_modules([('typed', {}),
+                                   ('typed', {'port': '80'}),
+                                   ('typed', {'port': 80, 'other': 1}),
+                                   ('typed', {'port': 80, 'hosts': [1]}),
+                                   ('typed', {'port': 80})])
+    assert [result.get('error') for result in results] ==\
+        ['missing_argument', 'invalid_argument', 'invalid_argument',
+         'invalid_argument', None]
+
+    instance = modman.loaded_modules[results[4]['instance']]
+    assert instance.get_loaded_kwargs('hosts') == ['local']
+    try:
+        modman.load_module('typed', port=True)
+        assert False
+    except ModuleLoadError:
+        pass
+    assert modman.get_instance_list_by_type('typed') == ['typed']
+
+    # undeclared arguments are accepted unless the class is strict
+    modman.load_module('multi', anything=1)
+
+
+class ProviderModule(Module):
+    """Module registering hooks, methods and interrupts."""
+
+    _module_desc = ModuleArgument('provider', 'provider')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+
+    def __init__(self, *args, **kwargs):
+        super(ProviderModule, self).__init__(*args, **kwargs)
+        name = self._registered_id
+        self.interrupt_handler(install_custom_hook='{}.hook'.format(name))
+        self.interrupt_handler(install_custom_method=('{}.method'
+                                                      .format(name),
+                                                      self.on_call))
+        self.interrupt_handler(install_interrupt_handler=('{}.irq'
+                                                          .format(name),
+                                                          self.on_call))
+        self.interrupt_handler(attach_manager_hook=('modman.tick',
+                                                    (self.on_call, None,
+                                                     name)))
+        self.interrupt_handler(attach_custom_hook=('provider.hook',
+                                                   (self.on_call, None,
+                                                    name)))
+
+    def on_call(self, *args, **kwargs):
+        return False
+
+
+def test_unload_owned_registrations():
+    modman = make_manager()
+    modman.insert_module(ProviderModule)
+    first = modman.load_module('provider')
+    second = modman.load_module('provider')
+    assert first == 'provider'
+    assert len(modman.attached_hooks['modman.tick'].attached_callbacks) == 2
+    assert len(modman.custom_hooks['provider.hook'].attached_callbacks) == 2
+
+    modman.unload_module(second)
+    assert sorted(modman.custom_hooks) == ['provider.hook']
+    assert list(modman.custom_methods) == ['provider.method']
+    assert list(modman.external_interrupts) == ['provider.irq']
+    assert [attached.argument for attached in
+            modman.attached_hooks['modman.tick'].attached_callbacks] ==\
+        [first]
+    assert [attached.argument for attached in
+            modman.custom_hooks['provider.hook'].attached_callbacks] ==\
+        [first]
+
+    modman.unload_module(first)
+    assert modman.custom_hooks == {}
+    assert modman.custom_methods == {}
+    assert modman.external_interrupts == {}
+    assert modman.attached_hooks['modman.tick'].attached_callbacks == []
+    assert modman._owner_registrations == {}
+
+
+def test_hook_callbacks():
+    hook = ModuleManagerHook('modman')
+    attachers = [HookAttacher(callback=len, action=None, argument=name)
+                 for name in ['a', 'b', 'c']]
+    listed = HookAttacher(callback=len, action=None, argument=['x'])
+    for attacher in attachers + [listed, attachers[0]]:
+        hook.attach_callback(attacher)
+    assert hook.attached_callbacks == attachers + [listed]
+    assert hook.find_callback_by_argument('b') == [attachers[1]]
+    assert hook.find_callback_by_argument(['x']) == [listed]
+
+    hook.detach_callback(HookAttacher(callback=len, action=None,
+                                      argument='b'))
+    hook.detach_callback(listed)
+    assert hook.attached_callbacks == [attachers[0], attachers[2]]
+    assert hook.find_callback_by_argument('b') == []
+    hook.attach_callback(attachers[1])
+    assert hook.attached_callbacks == [attachers[0], attachers[2],
+                                       attachers[1]]
+
+
+class BranchModule(Module):
+    """Module loading leaf instances, slow to unload."""
+
+    _module_desc = ModuleArgument('branch', 'loads leaves')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    _optional_kw = [ModuleArgument('leaves', 'number of leaves')]
+    unloaded = []
+
+    def __init__(self, *args, **kwargs):
+        super(BranchModule, self).__init__(*args, **kwargs)
+        for _ in range(kwargs.get('leaves', 0)):
+            self.interrupt_handler(load_module=('branch', {}))
+
+    def module_unload(self):
+        time.sleep(0.2)
+        self.unloaded.append(self._registered_id)
+
+
+def test_unload_tree():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None, load_workers=8)
+    modman.insert_module(BranchModule)
+    root = modman.load_module('branch', leaves=4)
+    other = modman.load_module('branch')
+    leaves = modman.get_instance_children(root)
+    assert len(leaves) == 4
+
+    start = time.time()
+    unloaded = modman.unload_tree(root)
+    assert time.time() - start < 0.6
+    assert sorted(unloaded[:4]) == sorted(leaves)
+    assert unloaded[4] == root
+    assert BranchModule.unloaded[-1] == root
+    assert list(modman.loaded_modules) == [other]
+    assert modman.get_instance_children(root) == []
+
+    # slow constructors in the load pool do not hold up unloading
+    modman.insert_module(SlowModule)
+    root = modman.load_module('branch', leaves=4)
+    for _ in range(8):
+        modman.submit_load_module('slow', delay=1.0)
+    start = time.time()
+    assert len(modman.unload_tree(root)) == 5
+    assert time.time() - start < 0.6
+    modman.finish_background_loads(wait=True)
+
+
+class StuckModule(Module):
+    """Module whose unloading blocks."""
+
+    _module_desc = ModuleArgument('stuck', 'blocks on unload')
+    _capabilities = [ModuleCapabilities.MultiInstanceAllowed]
+    release = None
+
+    def module_unload(self):
+        self.release.wait(5)
+
+
+class StuckBranchModule(Module):
+    """Module loading leaves whose unloading blocks."""
+
+    _module_desc = ModuleArgument('stuckbranch', 'loads stuck leaves')
+    _optional_kw = [ModuleArgument('leaves', 'number of leaves')]
+
+    def __init__(self, *args, **kwargs):
+        super(StuckBranchModule, self).__init__(*args, **kwargs)
+        for _ in range(kwargs.get('leaves', 0)):
+            self.interrupt_handler(load_module=('stuck', {}))
+
+
+def test_unload_tree_deadline():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None, load_workers=8)
+    modman.insert_module(StuckModule)
+    modman.insert_module(StuckBranchModule)
+    StuckModule.release = threading.Event()
+    modman.set_unload_deadline('stuck', 0.1)
+    root = modman.load_module('stuckbranch', leaves=3)
+    leaves = modman.get_instance_children(root)
+    assert len(leaves) == 3
+
+    start = time.time()
+    unloaded = modman.unload_tree(root)
+    assert time.time() - start < 0.6
+    assert sorted(unloaded[:3]) == sorted(leaves)
+    assert unloaded[3] == root
+    assert modman.loaded_modules == {}
+    StuckModule.release.set()
+
+
+def test_unload_outside_lock():
+    modman = ModuleManager(central_log='test', plugin_path=None,
+                           script_path=None, load_workers=4)
+    modman.insert_module(StuckModule)
+    modman.insert_module(SlowModule)
+    StuckModule.release = threading.Event()
+    stuck = modman.load_module('stuck')
+    unloading = threading.Thread(target=modman.unload_module, args=(stuck,))
+    unloading.start()
+    while stuck not in modman._unloading:
+        time.sleep(0.01)
+
+    # a slow module_unload does not hold up loads in other threads
+    start = time.time()
+    name = modman.load_module('slow', load_budget=0.05, delay=0.5)
+    assert time.time() - start < 0.3
+    try:
+        modman.unload_module(stuck)
+        assert False
+    except ModuleNotLoadedError:
+        pass
+
+    StuckModule.release.set()
+    unloading.join()
+    assert stuck not in modman.loaded_modules
+    modman.finish_background_loads(wait=True)
+    assert name in modman.loaded_modules
+
+
+class DetachedModule(Module):
+    """Module calling the manager while being unloaded."""
+
+    _module_desc = ModuleArgument('detached', 'calls back on unload')
+    replies = []
+
+    def module_unload(self):
+        self.replies.append(self.interrupt_handler(unload_module='missing'))
+
+
+def test_detached_handler_error():
+    modman = make_manager()
+    modman.insert_module(DetachedModule)
+    name = modman.load_module('detached')
+    assert modman.submit_unload_module(name, deadline=1).result(timeout=1)
+    assert DetachedModule.replies == [{'status': 'error',
+                                       'error': 'invalid_instance'}]
+
+
+def test_unload_deadline():
+    modman = make_manager()
+    modman.insert_module(StuckModule)
+    StuckModule.release = threading.Event()
+    modman.set_unload_deadline('stuck', 0.05)
+    first = modman.load_module('stuck')
+    second = modman.load_module('stuck')
+
+    start = time.time()
+    modman.unload_module(first)
+    assert time.time() - start < 0.1
+    assert first not in modman.loaded_modules
+    assert modman.get_instance_list_by_type('stuck') == [second]
+
+    future = modman.submit_unload_module(second)
+    assert not future.result(timeout=1)
+    StuckModule.release.set()
+
+    modman.set_unload_deadline('stuck', None)
+    third = modman.load_module('stuck')
+    assert modman.submit_unload_module(third, deadline=1).result(timeout=1)
+
+
+class Listener(object):
+    """Object registering weakly referenced callbacks."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_call(self, **kwargs):
+        self.calls += 1
+
+
+def test_weak_callbacks():
+    modman = make_manager()
+    modman.install_custom_hook('test.hook')
+    listener = Listener()
+    kept = Listener()
+    modman.attach_custom_hook('test.hook', listener.on_call, None, 'x',
+                              weak=True)
+    modman.attach_custom_hook('test.hook', kept.on_call, None, 'y')
+    modman.install_custom_method('test.method', listener.on_call, weak=True)
+    modman.install_interrupt_handler('test.irq', listener.on_call, weak=True)
+
+    modman.trigger_custom_hook('test.hook')
+    modman.call_custom_method('test.method')
+    modman.external_interrupt('test.irq')
+    assert listener.calls == 3
+
+    del listener
+    gc.collect()
+    hook = modman.custom_hooks['test.hook']
+    assert len(hook.attached_callbacks) == 2
+    modman.trigger_custom_hook('test.hook')
+    assert [attached.argument for attached in hook.attached_callbacks] ==\
+        ['y']
+    assert kept.calls == 2
+
+    try:
+        modman.call_custom_method('test.method')
+        assert False
+    except MethodNotAvailableError:
+        pass
+    assert 'test.method' not in modman.custom_methods
+    modman.external_interrupt('test.irq')
+    assert 'test.irq' not in modman.external_interrupts
+    modman.install_interrupt_handler('test.irq', kept.on_call)
+
+    # pruned callbacks leave nothing behind in the owner index
+    for _ in range(100):
+        listener = Listener()
+        modman.attach_custom_hook('test.hook', listener.on_call, None, 'x',
+                                  weak=True)
+        modman.attach_manager_hook('modman.tick', listener.on_call, None,
+                                   'x', weak=True)
+        del listener
+        gc.collect()
+        modman.trigger_custom_hook('test.hook')
+        modman.module_system_tick()
+    assert 'x' not in modman._owner_registrations
+    assert len(modman._owner_registrations['y']) == 1
+
+
+def test_handle_multiple_instance():
+    assert handle_multiple_instance('hot', []) == 1
+    assert handle_multiple_instance('hot', ['hot', 'hot-1', 'hot-4',
+                                            'other-7']) == 5
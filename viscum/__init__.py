@@ -1,9 +1,11 @@
 """Viscum: a Plugin manager."""
 
-import imp
 import logging
-from collections import namedtuple
+from collections import namedtuple, deque
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                Future, wait as futures_wait)
 from viscum.plugin import ModuleCapabilities
+from viscum.plugin.stub import ModuleStub
 from viscum.plugin.exception import (ModuleLoadError,
                                      ModuleAlreadyLoadedError,
                                      ModuleNotLoadedError,
@@ -16,23 +18,99 @@ from viscum.exception import (InterruptAlreadyInstalledError,
                               CannotUnloadError,
                               HookAlreadyInstalledError,
                               MethodAlreadyInstalledError,
-                              DeferModuleDiscovery)
+                              DeferModuleDiscovery,
+                              SnapshotError)
 from viscum.hook import (ModuleManagerHook,
                          ModuleManagerHookActions as MMHookAct)
 from viscum.scripting import (ModuleManagerScript,
                               DeferScriptLoading,
                               CancelScriptLoading)
+from viscum.manifest import (DiscoveryManifest, describe_plugin,
+                             entry_is_current)
+from viscum.discovery import (DiscoveryScheduler, inspect_plugin,
+                              open_plugin_catalog)
+from viscum.profiling import StartupProfiler
+from viscum.standby import StandbyPool
+from viscum.weak import WeakCallback, is_dead
+from viscum.snapshot import (storable_kwargs, dependency_order,
+                             write_snapshot, read_snapshot)
+import heapq
 import re
 import glob
+import inspect
 import os
+import threading
 
 MODULE_HANDLER_LOGGING_KWARGS = ['log_info', 'log_warning', 'log_error']
 
 
-# helper functions
+class InstanceSuffixAllocator(object):
+    """Allocates numeric suffixes for instances sharing a base name."""
+
+    def __init__(self, reuse=False):
+        """Initialize.
+
+        Args
+        ----
+        reuse: bool
+            Hand out suffixes of unloaded instances again, lowest first
+        """
+        self.reuse = reuse
+        self._next = 1
+        self._freed = []
+
+    def allocate(self, base_name, is_taken):
+        """Return a suffix not used by any loaded instance.
+
+        Args
+        ----
+        base_name: str
+            Name the suffix is appended to
+        is_taken: function
+            Tells whether an instance name is in use
+        """
+        while len(self._freed) > 0:
+            suffix = heapq.heappop(self._freed)
+            if not is_taken('{}-{}'.format(base_name, suffix)):
+                return suffix
+
+        # skip names taken by explicitly suffixed instances
+        suffix = self._next
+        while is_taken('{}-{}'.format(base_name, suffix)):
+            suffix += 1
+        self._next = suffix + 1
+        return suffix
+
+    def release(self, suffix):
+        """Give back the suffix of an unloaded instance.
+
+        Args
+        ----
+        suffix: int
+            Suffix returned by allocate()
+        """
+        if self.reuse:
+            heapq.heappush(self._freed, suffix)
+
+    def claim(self, suffix):
+        """Mark a suffix as in use, without going through allocate().
+
+        Args
+        ----
+        suffix: int
+            Suffix of an instance created under a given name
+        """
+        if suffix in self._freed:
+            self._freed.remove(suffix)
+            heapq.heapify(self._freed)
+        self._next = max(self._next, suffix + 1)
+
+
 def handle_multiple_instance(module_name, loaded_module_list):
     """Handle multiple instance plugin loading.
 
+    Kept for compatibility, the module manager allocates suffixes with
+    InstanceSuffixAllocator
     Args
     ----
     module_name: str
@@ -61,20 +139,62 @@ HookAttacher = namedtuple('HookAttacher', ['callback', 'action', 'argument'])
 class ModuleManager(object):
     """Module manager class."""
 
-    def __init__(self, central_log, plugin_path, script_path):
+    def __init__(self, central_log, plugin_path, script_path,
+                 manifest_path=None, profile=False,
+                 reuse_instance_suffixes=False, load_workers=None):
         """Initialize.
 
         Args
         ----
         central_log: str
             Logger name
-        plugin_path: str
-            Location where plugins are stored
-        script_path:
-            Location where scripts are stored
+        plugin_path: str or list
+            Location where plugins are stored, either a plugins folder
+            or a plugin pack built with viscum.pack.build_plugin_pack;
+            or a list of those, highest precedence first
+        script_path: str or list
+            Location where scripts are stored, or a list of locations,
+            highest precedence first
+        manifest_path: str
+            Location of the discovery manifest file, optional
+        profile: bool
+            Record timing of discovery, script and module loading
+        reuse_instance_suffixes: bool
+            Number new instances of multi-instance modules with the
+            lowest suffix freed by an unload, instead of always counting
+            up
+        load_workers: int
+            Maximum number of threads running plugin constructors for
+            concurrent loads
         """
         self.found_modules = {}
         self.loaded_modules = {}
+        # loaded instance names by type, in load order
+        self._instances_by_type = {}
+        # instances indexed by the instance that loaded them
+        self._children = {}
+        # instances running module_unload, and owners still to be told
+        # that a provider was unloaded
+        self._unloading = set()
+        self._notifications = deque()
+        # multi instance suffixes, by base instance name
+        self.reuse_instance_suffixes = reuse_instance_suffixes
+        self._suffix_allocators = {}
+        self._allocated_suffixes = {}
+        # concurrent loading: instances being constructed, by name
+        self.load_workers = load_workers
+        self._load_executor = None
+        self._unload_executor = None
+        self._pending_instances = {}
+        # constructions running in workers, and the finished ones waiting
+        # to be registered by finish_background_loads
+        self._background_loads = {}
+        self._finished_loads = deque()
+        self._background_lock = threading.Lock()
+        self._standby_pools = {}
+        self._load_budgets = {}
+        self._unload_deadlines = {}
+        self._registry_lock = threading.RLock()
         self.logger = logging.getLogger('{}.drvman'.format(central_log))
 
         # hooks
@@ -82,16 +202,26 @@ class ModuleManager(object):
                                ModuleManagerHook('modman'),
                                'modman.module_unloaded':
                                ModuleManagerHook('modman'),
+                               'modman.module_ready':
+                               ModuleManagerHook('modman'),
                                'modman.tick':
                                ModuleManagerHook('modman')}
+        # runs coroutines returned by hook callbacks, see viscum.aio
+        self.hook_coroutine_runner = None
 
         self.custom_hooks = {}
         self.custom_methods = {}
         self.external_interrupts = {}
+        # registrations indexed by owner instance, see _note_registration
+        self._owner_registrations = {}
 
         self.scripts = {}
 
         self.plugin_path = plugin_path
+        if plugin_path is not None:
+            self.plugin_source = open_plugin_catalog(plugin_path)
+        else:
+            self.plugin_source = None
         self.script_path = script_path
         self.tick_counter = 0
 
@@ -99,14 +229,54 @@ class ModuleManager(object):
         self.discovery_active = False
 
         # module discovery deferral
-        self.deferred_discoveries = {}
+        self._discovery_scheduler = DiscoveryScheduler()
+        # script -> names of required instances
         self.deferred_scripts = {}
+        self._script_requirements = {}
+        # required instance name -> scripts waiting on it
+        self._deferred_by_instance = {}
+
+        # python modules imported ahead of discovery (parallel discovery)
+        self._preloaded_sources = {}
+        # plugins described by worker processes (lazy discovery)
+        self._inspected_entries = {}
+
+        # discovery manifest
+        if manifest_path is not None:
+            self.manifest = DiscoveryManifest(manifest_path)
+        else:
+            self.manifest = None
+        self._discovery_side_effects = False
+        self._discovery_requires = []
+        self._discovery_registrations = []
+
+        # per plugin (Actual python module) discovery state, used to
+        # detect and apply changes on disk
+        self._plugin_stats = {}
+        self._plugin_types = {}
+        self._plugin_registrations = {}
+        self._plugin_discovery_info = {}
+        self.rediscover_interval = None
+        self.rediscover_reloads = False
+
+        # startup profiling
+        self.profiler = StartupProfiler(enabled=profile)
+
+    @property
+    def deferred_discoveries(self):
+        """Plugins whose discovery is deferred, and what they wait on."""
+        return self._discovery_scheduler.waiting()
 
     def module_system_tick(self):
         """Timer function called by main loop."""
+        self.finish_background_loads()
         self.tick_counter += 1
         self._trigger_manager_hook('modman.tick', uptime=self.tick_counter)
 
+        if self.rediscover_interval is not None and\
+           self.tick_counter % self.rediscover_interval == 0:
+            self.rediscover(reload_instances=self.rediscover_reloads)
+
     def install_custom_hook(self, hook_name):
         """Install a custom hook into the manager system.
 
@@ -132,8 +302,9 @@ class ModuleManager(object):
 
         self.logger.debug('custom hook {} installed'.format(hook_name))
         self.custom_hooks[hook_name] = ModuleManagerHook(installed_by)
+        self._note_registration(installed_by, ('custom_hook', hook_name))
 
-    def install_custom_method(self, method_name, callback):
+    def install_custom_method(self, method_name, callback, weak=False):
         """Install a custom method, made available to all loaded modules.
 
         Args
@@ -142,11 +313,13 @@ class ModuleManager(object):
            Method Name
         callback: function
            Callback function
+        weak: bool
+           Do not keep the callback alive, see WeakCallback
         """
-        self._install_custom_method(method_name, callback)
+        self._install_custom_method(method_name, callback, weak=weak)
 
     def _install_custom_method(self, method_name,
-                               callback, installer='modman'):
+                               callback, installer='modman', weak=False):
         """Inner function to install the custom method.
 
         Args
@@ -157,14 +330,23 @@ class ModuleManager(object):
             Callback function
         intaller: str
             Module instance name, owner of callback
+        weak: bool
+            Do not keep the callback alive, see WeakCallback
         """
         if method_name in self.custom_methods:
-            raise MethodAlreadyInstalledError('method is already installed')
+            if not is_dead(self.custom_methods[method_name].call):
+                raise MethodAlreadyInstalledError('method is already '
+                                                  'installed')
+            self._drop_dead_method(method_name)
+
+        if weak:
+            callback = WeakCallback(callback)
 
         self.logger.debug('custom method "{}" installed, calls {}'
                           .format(method_name, callback))
         self.custom_methods[method_name] = ModuleManagerMethod(call=callback,
                                                                owner=installer)
+        self._note_registration(installer, ('custom_method', method_name))
 
     def call_custom_method(self, method_name, *args, **kwargs):
         """Call a custom method, if available.
@@ -178,12 +360,17 @@ class ModuleManager(object):
         kwargs: dict
             Keyword arguments to be passed to method
         """
+        self._note_discovery_side_effect()
         if method_name in self.custom_methods:
-            return self.custom_methods[method_name].call(*args, **kwargs)
+            if is_dead(self.custom_methods[method_name].call):
+                self._drop_dead_method(method_name)
+            else:
+                return self.custom_methods[method_name].call(*args, **kwargs)
 
         raise MethodNotAvailableError('requested method is not available')
 
-    def attach_custom_hook(self, attach_to, callback, action, argument):
+    def attach_custom_hook(self, attach_to, callback, action, argument,
+                           weak=False):
         """Attach a callback to a custom hook, if available.
 
         Args
@@ -196,12 +383,19 @@ class ModuleManager(object):
             Action to be performed on trigger event
         argument: list, dict
             Arguments passed to callback
+        weak: bool
+            Do not keep the callback alive, see WeakCallback
         """
+        self._note_discovery_side_effect()
+        if weak:
+            callback = WeakCallback(callback)
         if attach_to in self.custom_hooks:
-            self.custom_hooks[attach_to].attach_callback(
-                HookAttacher(callback=callback,
-                             action=action,
-                             argument=argument))
+            attacher = HookAttacher(callback=callback,
+                                    action=action,
+                                    argument=argument)
+            self.custom_hooks[attach_to].attach_callback(attacher)
+            self._note_registration(argument, ('custom_hook_callback',
+                                               attach_to, attacher))
             self.logger.debug('callback {} installed into '
                               'custom hook {} with action {}'
                               .format(callback,
@@ -211,7 +405,8 @@ class ModuleManager(object):
 
         raise HookNotAvailableError('the requested hook is not available')
 
-    def attach_manager_hook(self, attach_to, callback, action, driver_class):
+    def attach_manager_hook(self, attach_to, callback, action, driver_class,
+                            weak=False):
         """Attach a callback to a manager default hook.
 
         Args
@@ -224,12 +419,19 @@ class ModuleManager(object):
            Action to be performed on trigger event
         driver_class: class
            Plugin class as argument
+        weak: bool
+           Do not keep the callback alive, see WeakCallback
         """
+        self._note_discovery_side_effect()
+        if weak:
+            callback = WeakCallback(callback)
         if attach_to in self.attached_hooks:
-            self.attached_hooks[attach_to].attach_callback(
-                HookAttacher(callback=callback,
-                             action=action,
-                             argument=driver_class))
+            attacher = HookAttacher(callback=callback,
+                                    action=action,
+                                    argument=driver_class)
+            self.attached_hooks[attach_to].attach_callback(attacher)
+            self._note_registration(driver_class, ('manager_hook_callback',
+                                                   attach_to, attacher))
             self.logger.debug('callback {} installed into hook '
                               '{} with action {}'
                               .format(callback,
@@ -239,7 +441,7 @@ class ModuleManager(object):
 
         raise HookNotAvailableError('the requested hook is not available')
 
-    def install_interrupt_handler(self, interrupt_key, callback):
+    def install_interrupt_handler(self, interrupt_key, callback, weak=False):
         """Install a custom interrupt handler.
 
         Args
@@ -248,11 +450,13 @@ class ModuleManager(object):
             Interrupt name
         callback: function
             Interrupt callback
+        weak: bool
+            Do not keep the callback alive, see WeakCallback
         """
-        self._install_interrupt_handler(interrupt_key, callback)
+        self._install_interrupt_handler(interrupt_key, callback, weak=weak)
 
     def _install_interrupt_handler(self, interrupt_key,
-                                   callback, installer='modman'):
+                                   callback, installer='modman', weak=False):
         """Inner function to install a interrupt handler.
 
         Args
@@ -263,9 +467,17 @@ class ModuleManager(object):
             Interrupt callback
         installer: str
             Module or instance name that installed this interrupt
+        weak: bool
+            Do not keep the callback alive, see WeakCallback
         """
         if interrupt_key in self.external_interrupts:
-            raise InterruptAlreadyInstalledError('interrupt already installed')
+            if not is_dead(self.external_interrupts[interrupt_key].call):
+                raise InterruptAlreadyInstalledError('interrupt already '
+                                                     'installed')
+            self._drop_dead_interrupt(interrupt_key)
+
+        if weak:
+            callback = WeakCallback(callback)
 
         self.logger.debug('custom interrupt "{}" was installed, calls "{}"'
                           .format(interrupt_key,
@@ -273,21 +485,119 @@ class ModuleManager(object):
         self.external_interrupts[interrupt_key] =\
             ModuleManagerMethod(call=callback,
                                 owner=installer)
+        self._note_registration(installer, ('interrupt', interrupt_key))
 
-    def require_discovered_module(self, module_type):
-        """Require a certain module to be present at discovery time.
+    def _note_registration(self, owner, registration):
+        """Index a registration by the instance that owns it.
 
-        if the module is not present (not discovered), then raises an
-        exception that ultimately defers the discovery until such
-        module is discovered
+        Hook callbacks are owned by the instance named by their argument;
+        unloading an instance only looks at what it owns
         Args
         ----
-        module_type: str
-            Type of the required module
+        owner: str, object
+            Owner instance name; other hook arguments are not indexed
+        registration: tuple
+            Kind, name and, for hook callbacks, the attacher
+        """
+        self._note_discovery_side_effect(registration)
+        if isinstance(owner, str):
+            self._owner_registrations.setdefault(owner,
+                                                 {})[registration] = None
+
+    def _forget_registration(self, owner, registration):
+        """Remove a registration from the index of its owner.
+
+        Args
+        ----
+        owner: str, object
+            Owner instance name
+        registration: tuple
+            Kind, name and, for hook callbacks, the attacher
+        """
+        if not isinstance(owner, str):
+            return
+
+        owned = self._owner_registrations.get(owner)
+        if owned is not None:
+            owned.pop(registration, None)
+            if len(owned) == 0:
+                del self._owner_registrations[owner]
+
+    def _drop_dead_method(self, method_name):
+        """Remove a custom method whose callback was garbage collected.
+
+        Args
+        ----
+        method_name: str
+            Method name
+        """
+        method = self.custom_methods.pop(method_name)
+        self._forget_registration(method.owner,
+                                  ('custom_method', method_name))
+
+    def _drop_dead_interrupt(self, interrupt_key):
+        """Remove an interrupt whose callback was garbage collected.
+
+        Args
+        ----
+        interrupt_key: str
+            Interrupt name
+        """
+        interrupt = self.external_interrupts.pop(interrupt_key)
+        self._forget_registration(interrupt.owner,
+                                  ('interrupt', interrupt_key))
+
+    def _prune_dead_callbacks(self, hook_dict, hook_name):
+        """Detach the garbage collected callbacks of a hook.
+
+        Args
+        ----
+        hook_dict: dict
+           Name-indexed dictionary of registered hooks
+        hook_name: str
+           Hook name
+        """
+        if hook_dict is self.attached_hooks:
+            kind = 'manager_hook_callback'
+        else:
+            kind = 'custom_hook_callback'
+        for attacher in hook_dict[hook_name].prune_dead():
+            self._forget_registration(attacher.argument,
+                                      (kind, hook_name, attacher))
+
+    def require_discovered_module(self, *module_types):
+        """Require certain modules to be present at discovery time.
+
+        if any module is not present (not discovered), then raises an
+        exception that ultimately defers the discovery until all of
+        them are discovered
+        Args
+        ----
+        module_types: list
+            Types of the required modules
         """
         if self.discovery_active:
-            if module_type not in self.found_modules:
-                raise DeferModuleDiscovery(module_type)
+            self._discovery_requires.extend(module_types)
+            missing = [module_type for module_type in module_types
+                       if module_type not in self.found_modules]
+            if len(missing) > 0:
+                raise DeferModuleDiscovery(*missing)
+
+    def _note_discovery_side_effect(self, registration=None):
+        """Flag the plugin being discovered as interacting with the manager.
+
+        Such plugins cannot be served from the discovery manifest, since
+        their discover_module() must run on every start. Registrations
+        are remembered so they can be undone if the plugin goes away.
+        Args
+        ----
+        registration: tuple
+            Kind of registration, name and optionally the attacher
+        """
+        if self.discovery_active:
+            self._discovery_side_effects = True
+            if registration is not None:
+                self._discovery_registrations.append(registration)
 
     def insert_module(self, module_class):
         """Manually insert a module class as a discovered plugin.
@@ -297,12 +607,198 @@ class ModuleManager(object):
         module_class: class
             Class of the module
         """
+        module_class.get_kwargs_validator()
         self.found_modules[module_class.get_module_desc().arg_name] =\
             module_class
         self.logger.info('Manually '
                          'inserting module "{}"'
                          .format(module_class.get_module_desc().arg_name))
 
+    def _load_module_source(self, module):
+        """Import the python module of a plugin.
+
+        Uses the result of a previous parallel import if available
+        Args
+        ----
+        module: str
+           Module name (Actual python module)
+        """
+        if module in self._preloaded_sources:
+            source = self._preloaded_sources.pop(module)
+            if isinstance(source, Exception):
+                raise source
+            return source
+
+        return self._import_module_source(module)
+
+    def _import_module_source(self, module):
+        """Actually import the python module of a plugin.
+
+        Args
+        ----
+        module: str
+           Module name (Actual python module)
+        """
+        with self.profiler.span('import', module):
+            return self.plugin_source.load_source(module)
+
+    def _preload_module_sources(self, module_list, max_workers=None):
+        """Import the python modules of several plugins concurrently.
+
+        Only the import is done here; failures are stored and raised
+        again when the module is actually discovered
+        Args
+        ----
+        module_list: list
+           Module names (Actual python modules)
+        max_workers: int
+           Maximum number of worker threads
+        """
+        def import_source(module):
+            try:
+                return self._import_module_source(module)
+            except Exception as ex:
+                return ex
+
+        module_list = [module for module in module_list
+                       if module != '__init__']
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sources = executor.map(import_source, module_list)
+            self._preloaded_sources.update(zip(module_list, sources))
+
+    def _inspect_module(self, module):
+        """Import a plugin and call its discover_module().
+
+        Returns the plugin class, which is recorded in the manifest
+        Args
+        ----
+        module: str
+           Module name (Actual python module)
+        """
+        the_mod = self._load_module_source(module)
+        self.logger.info('inspecting module file: "{}"'.format(module))
+        # guard discovery procedure
+        self.discovery_active = True
+        self._discovery_side_effects = False
+        self._discovery_requires = []
+        self._discovery_registrations = []
+        try:
+            with self.profiler.span('discover', module):
+                module_class = the_mod.discover_module(
+                    modman=self,
+                    plugin_path=self.plugin_source.plugin_path(module))
+        finally:
+            self.discovery_active = False
+            self._plugin_registrations[module] =\
+                self._discovery_registrations
+
+        self._plugin_discovery_info[module] =\
+            {'cacheable': not self._discovery_side_effects,
+             'requires': list(self._discovery_requires)}
+        if self.manifest is not None:
+            self.manifest.record(module, self.plugin_source, module_class,
+                                 cacheable=not self._discovery_side_effects,
+                                 requires=self._discovery_requires)
+
+        return module_class
+
+    def _manifest_lookup(self, module):
+        """Return the manifest entry of an unchanged plugin.
+
+        Returns None if the plugin must be imported
+        Args
+        ----
+        module: str
+           Module name (Actual python module)
+        """
+        if self.manifest is None:
+            return None
+
+        with self.profiler.span('manifest', module):
+            entry = self.manifest.lookup(module, self.plugin_source)
+        if entry is None or not entry['cacheable']:
+            return None
+
+        return entry
+
+    def _get_module_class(self, module_name):
+        """Return the class of a discovered plugin, importing it if needed.
+
+        Args
+        ----
+        module_name: str
+            Plugin type
+        """
+        module_class = self.found_modules[module_name]
+        if not isinstance(module_class, ModuleStub):
+            return module_class
+
+        self.logger.info('importing module "{}" on demand'
+                         .format(module_name))
+        try:
+            # records discovery information, as regular discovery does
+            module_class = self._inspect_module(module_class.plugin)
+        except Exception as ex:
+            raise ModuleLoadError('could not import module: {}'.format(ex),
+                                  module_name)
+
+        if module_class.get_module_desc().arg_name != module_name:
+            raise ModuleLoadError('plugin changed since discovery',
+                                  module_name)
+
+        self.found_modules[module_name] = module_class
+        return module_class
+
+    def _inspect_module_sources(self, module_list, max_workers=None):
+        """Describe plugins in worker processes, without importing them here.
+
+        Plugins that cannot be described this way (import errors, use of
+        the manager during discovery) are left for regular discovery
+        Args
+        ----
+        module_list: list
+           Module names (Actual python modules)
+        max_workers: int
+           Maximum number of worker processes
+        """
+        module_list = [module for module in module_list
+                       if module != '__init__']
+        if len(module_list) == 0:
+            return
+
+        inspect_span = self.profiler.span('inspect', 'workers')
+        with inspect_span, ProcessPoolExecutor(max_workers) as executor:
+            futures = [(module,
+                        executor.submit(inspect_plugin,
+                                        module,
+                                        self.plugin_source))
+                       for module in module_list]
+            for module, future in futures:
+                try:
+                    entry = future.result()
+                except Exception as ex:
+                    self.logger.debug('could not inspect module file "{}" '
+                                      'in isolation: {}'.format(module, ex))
+                    continue
+
+                if entry is not None and entry['cacheable']:
+                    self._inspected_entries[module] = entry
+
+    def _module_stub(self, entry):
+        """Build a stub from a plugin entry, deferring on missing types.
+
+        Args
+        ----
+        entry: dict
+           Plugin entry, as recorded in the manifest
+        """
+        missing = [required for required in entry['requires']
+                   if required not in self.found_modules]
+        if len(missing) > 0:
+            raise DeferModuleDiscovery(*missing)
+
+        return ModuleStub(entry)
+
     def _module_discovery(self, module):
         """Discover all modules.
 
@@ -318,21 +814,30 @@ class ModuleManager(object):
 
         # success flag
         discovery_succeeded = False
+        discovery_deferred = False
+        module_type = None
+
+        try:
+            self._plugin_stats[module] = self.plugin_source.stat(module)
+        except (IOError, OSError):
+            self._plugin_stats[module] = None
 
         try:
-            the_mod = imp.load_source(module,
-                                      os.path.join(self.plugin_path,
-                                                   module,
-                                                   '__init__.py'))
-            self.logger.info('inspecting module file: "{}"'.format(module))
-            # guard discovery procedure
-            self.discovery_active = True
-            plugin_path = os.path.join(self.plugin_path,
-                                       module)
-            module_class = the_mod.discover_module(modman=self,
-                                                   plugin_path=plugin_path)
+            entry = self._manifest_lookup(module)
+            if entry is None:
+                entry = self._inspected_entries.get(module)
+            if entry is None:
+                module_class = self._inspect_module(module)
+            else:
+                module_class = self._module_stub(entry)
+                self.logger.info('module file "{}" described without '
+                                 'importing'.format(module))
+                if self.manifest is not None:
+                    self.manifest.insert(entry)
             module_type = module_class.get_module_desc().arg_name
+            module_class.get_kwargs_validator()
             self.found_modules[module_type] = module_class
+            self._plugin_types[module] = module_type
             self.logger.info('Discovery of module "{}" succeeded'
                              .format(module_class.get_module_desc().arg_name))
             discovery_succeeded = True
@@ -341,125 +846,1006 @@ class ModuleManager(object):
                                 .format(module,
                                         error))
         except DeferModuleDiscovery as ex:
-            self.logger.info('deferring discovery of module')
-            # hacky
-            self.deferred_discoveries[module] = ex.args[0]
+            self.logger.info('deferring discovery of module "{}" until {} '
+                             'discovered'.format(module, list(ex.args)))
+            self._discovery_scheduler.defer(module, ex.args)
+            self.profiler.note_deferral(module, ex.args)
+            discovery_deferred = True
         except Exception as error:
             # raise  # debug
             # catch anything else because this cannot break the application
             self.logger.warning('could not register module {}: {}'
                                 .format(module, error))
 
-        # check for deferrals that depend on the previous loaded module
-        deferred_done = []
-        for deferred, dependency in self.deferred_discoveries.items():
-            if dependency == module and discovery_succeeded:
-                # discover (recursive!)
-                self.logger.debug('dependency for deferred '
-                                  '"{}" met; discovering now'
-                                  .format(deferred))
-                self._module_discovery(deferred)
-                deferred_done.append(deferred)
-
-        # remove done deferrals
-        for deferred in deferred_done:
-            del self.deferred_discoveries[deferred]
+        if self.manifest is not None and not discovery_succeeded and\
+           not discovery_deferred:
+            self.manifest.remove(module)
+
+        # wake up deferrals that depend on this module
+        if discovery_succeeded:
+            self._discovery_scheduler.resolve(module_type)
+
+    def _run_deferred_discoveries(self):
+        """Discover deferred plugins whose dependencies are now met."""
+        deferred = self._discovery_scheduler.next_ready()
+        while deferred is not None:
+            self.logger.debug('dependencies for deferred '
+                              '"{}" met; discovering now'
+                              .format(deferred))
+            self.profiler.note_resumed(deferred)
+            self._module_discovery(deferred)
+            deferred = self._discovery_scheduler.next_ready()
+
+    def _list_plugins(self):
+        """Return the names of the plugins present in the plugin roots."""
+        self.plugin_source.refresh()
+        for plugin, sources in self.plugin_source.shadowed.items():
+            self.logger.debug('plugin "{}" from {} shadows the one(s) in {}'
+                              .format(plugin,
+                                      self.plugin_source.source_of(
+                                          plugin).path,
+                                      [source.path for source in sources]))
+
+        return self.plugin_source.list_plugins()
+
+    def discover_modules(self, parallel=False, max_workers=None,
+                         lazy=False):
+        """Discovery routine wrapper.
+
+        Iterates through all found files in the plugins subfolder
+        Args
+        ----
+        parallel: bool
+            Import plugin files concurrently before discovering them
+        max_workers: int
+            Maximum number of import threads or inspection processes
+        lazy: bool
+            Register stubs for plugins whose discovery does not need the
+            manager, importing them only when first loaded
+        """
+        module_list = self._list_plugins()
+        pending_list = [module for module in module_list
+                        if self._manifest_lookup(module) is None]
+
+        # plugins not in the manifest are described by worker processes,
+        # so their code and dependencies are never imported here
+        if lazy:
+            self._inspect_module_sources(pending_list, max_workers)
+            pending_list = [module for module in pending_list
+                            if module not in self._inspected_entries]
+
+        # imports run concurrently; discover_module() calls and
+        # registration still happen one by one, in list order
+        if parallel:
+            self._preload_module_sources(pending_list, max_workers)
+
+        for module in module_list:
+            self._module_discovery(module)
+            self._run_deferred_discoveries()
+
+        # drop imports that were never used
+        self._preloaded_sources.clear()
+        self._inspected_entries.clear()
+
+        if self.manifest is not None:
+            self.manifest.prune(module_list)
+            try:
+                self.manifest.save()
+            except (IOError, OSError) as ex:
+                self.logger.warning('could not save discovery manifest: {}'
+                                    .format(ex))
+
+        if len(self.deferred_discoveries) > 0:
+            self.logger.warning('some modules could not be discovered because'
+                                ' they had dependencies that were not met: {}'
+                                .format(
+                                    list(self.deferred_discoveries.keys())))
+
+    def watch_plugins(self, interval, reload_instances=False):
+        """Poll the plugins folder for changes periodically.
+
+        Args
+        ----
+        interval: int
+            Number of ticks between polls, None disables polling
+        reload_instances: bool
+            Reload live instances of changed plugins
+        """
+        self.rediscover_interval = interval
+        self.rediscover_reloads = reload_instances
+
+    def rediscover(self, reload_instances=False):
+        """Discover added, removed and modified plugins.
+
+        Only the affected plugins are imported again. Returns the names
+        of the affected plugins (Actual python modules)
+        Args
+        ----
+        reload_instances: bool
+            Unload live instances of removed or modified plugins, and
+            load instances of modified plugins again with the same
+            arguments, under the same names
+        """
+        module_list = self._list_plugins()
+        changes = {'added': [], 'removed': [], 'modified': []}
+        for module in module_list:
+            if module not in self._plugin_stats:
+                changes['added'].append(module)
+                continue
+
+            try:
+                plugin_stats = self.plugin_source.stat(module)
+            except (IOError, OSError):
+                plugin_stats = None
+            if plugin_stats != self._plugin_stats[module]:
+                changes['modified'].append(module)
+
+        for module in self._plugin_stats:
+            if module not in module_list:
+                changes['removed'].append(module)
+
+        reload_list = []
+        for module in changes['removed'] + changes['modified']:
+            module_type = self._plugin_types.get(module)
+            if reload_instances and module_type is not None:
+                for instance_name in self.get_instance_list_by_type(
+                        module_type):
+                    instance = self.loaded_modules[instance_name]
+                    if module in changes['modified']:
+                        reload_list.append(
+                            self._reload_arguments(instance) +
+                            (instance_name,
+                             self._allocated_suffixes.get(instance_name)))
+                    self._unload_module(instance_name)
+            self._forget_plugin(module)
+
+        for module in changes['modified'] + changes['added']:
+            self._module_discovery(module)
+            self._run_deferred_discoveries()
+
+        reloaded = []
+        for module_type, loaded_by, kwargs, instance_name, suffix in\
+                reload_list:
+            try:
+                self._instantiate(module_type, loaded_by, kwargs,
+                                  instance_name, suffix)
+            except Exception as ex:
+                self.logger.error('could not reload instance "{}": {}'
+                                  .format(instance_name, ex))
+                continue
+            self._trigger_manager_hook('modman.module_loaded',
+                                       instance_name=instance_name)
+            reloaded.append(instance_name)
+        self._wake_deferred_scripts(*reloaded)
+
+        if self.manifest is not None:
+            try:
+                self.manifest.save()
+            except (IOError, OSError) as ex:
+                self.logger.warning('could not save discovery manifest: {}'
+                                    .format(ex))
+
+        for change, changed_list in changes.items():
+            if len(changed_list) > 0:
+                self.logger.info('plugins {}: {}'.format(change,
+                                                         changed_list))
+
+        return changes
+
+    @staticmethod
+    def _reload_arguments(instance):
+        """Return what is needed to load an instance again.
+
+        Args
+        ----
+        instance: Module
+            Loaded instance
+        """
+        kwargs = dict(instance._loaded_kwargs)
+        kwargs.pop('plugmgr', None)
+        loaded_by = kwargs.pop('loaded_by', 'modman')
+        return (instance.get_module_type(), loaded_by, kwargs)
+
+    def _forget_plugin(self, module):
+        """Drop a plugin and undo what its discovery registered.
+
+        Args
+        ----
+        module: str
+           Module name (Actual python module)
+        """
+        module_type = self._plugin_types.pop(module, None)
+        if module_type is not None:
+            self.found_modules.pop(module_type, None)
+        self._plugin_discovery_info.pop(module, None)
+
+        for registration in self._plugin_registrations.pop(module, []):
+            kind, name = registration[:2]
+            if kind == 'custom_hook':
+                self.custom_hooks.pop(name, None)
+            elif kind == 'custom_method':
+                self.custom_methods.pop(name, None)
+            elif kind == 'interrupt':
+                self.external_interrupts.pop(name, None)
+            elif kind == 'custom_hook_callback' and\
+                    name in self.custom_hooks:
+                self.custom_hooks[name].detach_callback(registration[2])
+            elif kind == 'manager_hook_callback':
+                self.attached_hooks[name].detach_callback(registration[2])
+
+        self._discovery_scheduler.forget(module)
+        self._plugin_stats.pop(module, None)
+        if self.manifest is not None:
+            self.manifest.remove(module)
+
+    def _discover_script(self, script):
+        """Discovery process of a single script.
+
+        Args
+        ----
+        script: str
+            script file path
+        """
+        try:
+            with self.profiler.span('script', script):
+                self.scripts[script] = ModuleManagerScript(script,
+                                                           self,
+                                                           initialize=True)
+        except DeferScriptLoading as ex:
+            self.logger.debug('deferring load of script {}, '
+                              'which requires module {} to be active'
+                              .format(script, str(ex)))
+            # put on deferred list
+            requirement = ex.args[0]
+            self._defer_script(script, requirement.get('names',
+                                                       [requirement['name']]))
+            return
+        except CancelScriptLoading as ex:
+            self.logger.info('loading of script {} was canceled'
+                             ' by the script with: {}'
+                             .format(script, ex))
+        except Exception as ex:
+            self.logger.warning('failed to load script {} with: {}'
+                                .format(script, ex))
+        self._script_requirements.pop(script, None)
+
+    def _defer_script(self, script, instance_names):
+        """Make a script wait until some instances are loaded.
+
+        Requirements add up over successive deferrals of the same script
+        Args
+        ----
+        script: str
+            script file path
+        instance_names: list
+            Names of the required instances
+        """
+        required = self._script_requirements.setdefault(script, set())
+        required.update(instance_names)
+        self.deferred_scripts[script] = sorted(required)
+        for instance_name in required:
+            if instance_name not in self.loaded_modules:
+                self._deferred_by_instance.setdefault(instance_name,
+                                                      {})[script] = None
+
+    def _wake_deferred_scripts(self, *instance_names):
+        """Run deferred scripts whose required instances are all loaded.
+
+        Args
+        ----
+        instance_names: list
+            Names of the instances that were just loaded
+        """
+        ready = []
+        with self._registry_lock:
+            scripts = {}
+            for instance_name in instance_names:
+                scripts.update(self._deferred_by_instance.pop(instance_name,
+                                                              {}))
+
+            for script in scripts:
+                if script not in self.deferred_scripts:
+                    continue
+                missing = [name for name in self._script_requirements[script]
+                           if name not in self.loaded_modules]
+                if len(missing) > 0:
+                    # wait on the others (again, if they were unloaded)
+                    for name in missing:
+                        self._deferred_by_instance.setdefault(
+                            name, {})[script] = None
+                    continue
+
+                for name in self.deferred_scripts.pop(script):
+                    waiting = self._deferred_by_instance.get(name)
+                    if waiting is not None:
+                        waiting.pop(script, None)
+                        if len(waiting) == 0:
+                            del self._deferred_by_instance[name]
+                ready.append(script)
+
+        # scripts may use the manager, run them without holding the lock
+        for script in ready:
+            self.logger.debug('instances required by script {} are loaded'
+                              .format(script))
+            self._discover_script(script)
+
+    def get_startup_report(self, slowest=10):
+        """Return timing of discovery, script and module loading phases.
+
+        Profiling must be enabled when creating the manager
+        Args
+        ----
+        slowest: int
+            Number of slowest items to list
+        """
+        return self.profiler.report(slowest)
+
+    def dump_startup_report(self, filename, slowest=10):
+        """Write the startup report to a JSON file.
+
+        Args
+        ----
+        filename: str
+            File path
+        slowest: int
+            Number of slowest items to list
+        """
+        self.profiler.dump(filename, slowest)
+
+    def discover_scripts(self):
+        """Discover available scripts.
+
+        When several script folders hold a script with the same file
+        name, only the one from the first folder is used
+        """
+        if isinstance(self.script_path, str):
+            script_roots = [self.script_path]
+        else:
+            script_roots = self.script_path
+
+        script_names = set()
+        for script_root in script_roots:
+            for script in glob.glob(os.path.join(script_root, '*.py')):
+                script_name = os.path.basename(script)
+                if script_name in script_names:
+                    continue
+                script_names.add(script_name)
+                self._discover_script(script)
+
+    def _is_module_type_present(self, module_class_name):
+        """Return whether any module of a certain type has been loaded.
+
+        Args
+        ----
+        module_class_name: string
+            Module type
+        """
+        return len(self._instances_by_type.get(module_class_name, ())) > 0
+
+    def load_module(self, module_name, **kwargs):
+        """Load module by type name, with named arguments.
+
+        Args
+        ----
+        module_name: str
+            Plugin name
+        kwargs: dict
+            Arguments passed to plugin
+        """
+        self.logger.info('Trying to load module '
+                         'of type "{}"'.format(module_name))
+        return self._load_module(module_name, **kwargs)
+
+    def _load_module(self, module_name, loaded_by='modman',
+                     load_budget=None, **kwargs):
+        """Load a module that has been previously discovered.
+
+        Args
+        ----
+        module_name: str
+            Plugin type
+        loaded_by: str
+            Instance that requested this to be loaded
+        load_budget: float
+            Seconds the constructor may block the caller, overrides the
+            budget of the plugin type
+        kwargs: dict
+            Arguments passed to plugin
+        """
+        if load_budget is None:
+            load_budget = self._load_budgets.get(module_name)
+        if load_budget is not None:
+            return self._load_within_budget(module_name, loaded_by,
+                                            load_budget, kwargs)
+
+        instance_name = self._instantiate(module_name, loaded_by, kwargs)
+
+        # trigger hooks
+        self._trigger_manager_hook('modman.module_loaded',
+                                   instance_name=instance_name)
+
+        # run scripts that were waiting on this instance
+        self._wake_deferred_scripts(instance_name)
+
+        return instance_name
+
+    def set_load_budget(self, module_name, load_budget):
+        """Limit how long loading a plugin type may block the caller.
+
+        Constructors running longer keep going in the background, the
+        instance is pending until they finish
+        Args
+        ----
+        module_name: str
+            Plugin type
+        load_budget: float
+            Seconds, None removes the limit
+        """
+        if load_budget is None:
+            self._load_budgets.pop(module_name, None)
+        else:
+            self._load_budgets[module_name] = load_budget
+
+    def is_instance_pending(self, instance_name):
+        """Tell whether an instance is still being constructed.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        """
+        return instance_name in self._pending_instances
+
+    def _load_within_budget(self, module_name, loaded_by, load_budget,
+                            kwargs):
+        """Load a module, waiting at most load_budget for its constructor.
+
+        Returns the instance name; if the constructor is still running
+        the instance is pending, it is registered and modman.module_ready
+        is triggered by finish_background_loads once the constructor
+        finishes
+        Args
+        ----
+        module_name: str
+            Plugin type
+        loaded_by: str
+            Instance that requested this to be loaded
+        load_budget: float
+            Seconds
+        kwargs: dict
+            Arguments passed to plugin
+        """
+        with self._registry_lock:
+            instance_name, module_class = self._prepare_instance(module_name,
+                                                                 loaded_by,
+                                                                 kwargs)
+        construction = self._get_load_executor().submit(
+            self._construct_instance, module_class, instance_name, kwargs)
+        futures_wait([construction], timeout=load_budget)
+
+        if construction.done():
+            self._complete_load(instance_name, construction)
+            return instance_name
+
+        self.logger.warning('instance "{}" exceeded its load budget of {}s, '
+                            'finishing in background'
+                            .format(instance_name, load_budget))
+
+        def load_done(instance_name, exception):
+            self._trigger_manager_hook('modman.module_ready',
+                                       instance_name=instance_name,
+                                       status='ok' if exception is None
+                                       else 'error')
+
+        self._finish_in_background(instance_name, construction, load_done)
+        return instance_name
+
+    def _complete_load(self, instance_name, construction):
+        """Register an instance built in a worker, then trigger hooks.
+
+        Args
+        ----
+        instance_name: str
+            Reserved instance name
+        construction: Future
+            Finished construction, holding the instance
+        """
+        with self._registry_lock:
+            self._finish_construction(instance_name, construction)
+        self._trigger_manager_hook('modman.module_loaded',
+                                   instance_name=instance_name)
+        self._wake_deferred_scripts(instance_name)
+
+    def _construct_in_background(self, module_class, instance_name, kwargs,
+                                 on_done):
+        """Run a constructor in a worker thread.
+
+        The worker only constructs; the instance is registered by the
+        next call to finish_background_loads
+        Args
+        ----
+        module_class: class
+            Plugin class
+        instance_name: str
+            Reserved instance name
+        kwargs: dict
+            Arguments passed to plugin, including plugmgr and loaded_by
+        on_done: function
+            Called after registration with the instance name and the
+            exception that made the load fail, or None
+        """
+        construction = self._get_load_executor().submit(
+            self._construct_instance, module_class, instance_name, kwargs)
+        self._finish_in_background(instance_name, construction, on_done)
+        return construction
+
+    def _finish_in_background(self, instance_name, construction, on_done):
+        """Queue a construction for finish_background_loads once done.
+
+        Args
+        ----
+        instance_name: str
+            Reserved instance name
+        construction: Future
+            Running construction
+        on_done: function
+            Called after registration with the instance name and the
+            exception that made the load fail, or None
+        """
+        with self._background_lock:
+            self._background_loads[instance_name] = construction
+
+        def construction_done(construction):
+            with self._background_lock:
+                self._background_loads.pop(instance_name, None)
+                self._finished_loads.append((instance_name, construction,
+                                             on_done))
+
+        construction.add_done_callback(construction_done)
+
+    def finish_background_loads(self, wait=False):
+        """Register the instances whose constructor finished in a worker.
+
+        Hooks and deferred scripts run in the calling thread, normally
+        the main loop through module_system_tick. Returns the names of
+        the registered instances
+        Args
+        ----
+        wait: bool
+            Wait for the constructors that are still running
+        """
+        if wait:
+            with self._background_lock:
+                running = list(self._background_loads.values())
+            futures_wait(running)
+
+        loaded = []
+        while True:
+            with self._background_lock:
+                if len(self._finished_loads) == 0:
+                    break
+                instance_name, construction, on_done =\
+                    self._finished_loads.popleft()
+            try:
+                self._complete_load(instance_name, construction)
+            except Exception as ex:
+                self.logger.error('could not load instance "{}": {}'
+                                  .format(instance_name, ex))
+                on_done(instance_name, ex)
+                continue
+            loaded.append(instance_name)
+            on_done(instance_name, None)
+
+        return loaded
+
+    def submit_load_module(self, module_name, loaded_by='modman', **kwargs):
+        """Load a module with its constructor running in a worker thread.
+
+        The instance name is picked right away; registration, hooks and
+        deferred scripts are handled in the main loop, by
+        finish_background_loads. Returns a future resolving to the
+        instance name once registered
+        Args
+        ----
+        module_name: str
+            Plugin type
+        loaded_by: str
+            Instance that requested this to be loaded
+        kwargs: dict
+            Arguments passed to plugin
+        """
+        with self._registry_lock:
+            instance_name, module_class = self._prepare_instance(module_name,
+                                                                 loaded_by,
+                                                                 kwargs)
+        future = Future()
+
+        def load_done(instance_name, exception):
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(instance_name)
+
+        self._construct_in_background(module_class, instance_name, kwargs,
+                                      load_done)
+        return future
+
+    def _get_load_executor(self):
+        """Return the thread pool running concurrent constructors."""
+        with self._background_lock:
+            if self._load_executor is None:
+                self._load_executor = ThreadPoolExecutor(
+                    max_workers=self.load_workers,
+                    thread_name_prefix='viscum-load')
+            return self._load_executor
+
+    def _get_unload_executor(self):
+        """Return the thread pool running module_unload of unload_tree.
+
+        Separate from the load pool, so that slow constructors do not
+        hold up unloading
+        """
+        with self._background_lock:
+            if self._unload_executor is None:
+                self._unload_executor = ThreadPoolExecutor(
+                    thread_name_prefix='viscum-unload')
+            return self._unload_executor
+
+    def load_modules(self, requests, loaded_by='modman', concurrent=False):
+        """Load several modules at once.
+
+        All requests are checked before any instance is created; hooks
+        are triggered and deferred scripts resolved after the whole batch
+        is loaded. Returns one result per request, in order
+        Args
+        ----
+        requests: list
+            Plugin types, or (plugin type, arguments dict) pairs
+        loaded_by: str
+            Instance that requested these to be loaded
+        concurrent: bool
+            Run the constructors in worker threads, see
+            submit_load_module()
+        """
+        results = []
+        accepted = []
+        batch_types = set()
+        for request in requests:
+            if isinstance(request, str):
+                module_name, kwargs = request, {}
+            else:
+                module_name, kwargs = request
+                kwargs = dict(kwargs)
+            result = {'module': module_name}
+            results.append(result)
+
+            error = self._check_load_request(module_name, kwargs, batch_types)
+            if error is not None:
+                result.update(status='error', error=error[0],
+                              message=error[1])
+                continue
+            batch_types.add(module_name)
+            accepted.append((result, module_name, kwargs))
+
+        if concurrent:
+            loaded = self._load_concurrently(accepted, loaded_by)
+        else:
+            loaded = []
+            for result, module_name, kwargs in accepted:
+                try:
+                    instance_name = self._instantiate(module_name,
+                                                      loaded_by, kwargs)
+                except Exception as ex:
+                    self._load_failed(result, ex)
+                    continue
+                result.update(status='ok', instance=instance_name)
+                loaded.append(instance_name)
+
+        for instance_name in loaded:
+            self._trigger_manager_hook('modman.module_loaded',
+                                       instance_name=instance_name)
+        self._wake_deferred_scripts(*loaded)
+
+        return results
+
+    def _load_concurrently(self, accepted, loaded_by):
+        """Construct checked load requests in worker threads.
+
+        Instances are registered in request order. Returns the names of
+        the registered instances
+        Args
+        ----
+        accepted: list
+            (result, plugin type, arguments) of each request
+        loaded_by: str
+            Instance that requested these to be loaded
+        """
+        executor = self._get_load_executor()
+        constructions = []
+        for result, module_name, kwargs in accepted:
+            try:
+                with self._registry_lock:
+                    instance_name, module_class =\
+                        self._prepare_instance(module_name, loaded_by, kwargs)
+            except Exception as ex:
+                self._load_failed(result, ex)
+                continue
+            constructions.append((result, instance_name,
+                                  executor.submit(self._construct_instance,
+                                                  module_class,
+                                                  instance_name, kwargs)))
+
+        loaded = []
+        for result, instance_name, construction in constructions:
+            # not holding the lock here, constructors may use the manager
+            futures_wait([construction])
+            try:
+                with self._registry_lock:
+                    self._finish_construction(instance_name, construction)
+            except Exception as ex:
+                self._load_failed(result, ex)
+                continue
+            result.update(status='ok', instance=instance_name)
+            loaded.append(instance_name)
+
+        return loaded
+
+    def _load_failed(self, result, exception):
+        """Record the failure of a request of a bulk load.
+
+        Args
+        ----
+        result: dict
+            Result of the request
+        exception: Exception
+            What went wrong
+        """
+        self.logger.error('could not load module "{}": {}'
+                          .format(result['module'], exception))
+        result.update(status='error', error='load_failed',
+                      message=str(exception))
+
+    def _check_load_request(self, module_name, kwargs, batch_types=()):
+        """Check that a module can be loaded with some arguments.
+
+        Returns None, or an (error, message) pair
+        Args
+        ----
+        module_name: str
+            Plugin type
+        kwargs: dict
+            Arguments passed to plugin
+        batch_types: set
+            Types of the other modules being loaded with this one
+        """
+        if module_name not in self.found_modules:
+            return ('invalid_module',
+                    'invalid module name: "{}"'.format(module_name))
+
+        module_class = self.found_modules[module_name]
+        error = module_class.get_kwargs_validator().check(kwargs)
+        if error is not None:
+            return error
+
+        if ModuleCapabilities.MultiInstanceAllowed not in\
+           module_class.get_capabilities():
+            if self._is_module_type_present(module_name) or\
+               module_name in batch_types:
+                return ('already_loaded', 'module is already loaded')
+
+        return None
+
+    def _instantiate(self, module_name, loaded_by, kwargs,
+                     instance_name=None, suffix=None):
+        """Name, create and register an instance, without triggering hooks.
+
+        The registry lock is only held while naming and registering, not
+        while the constructor runs
+        Args
+        ----
+        module_name: str
+            Plugin type
+        loaded_by: str
+            Instance that requested this to be loaded
+        kwargs: dict
+            Arguments passed to plugin
+        instance_name: str
+            Name to use instead of picking one, see _claim_instance_name
+        suffix: list
+            Base name and automatic suffix the given name was built from
+        """
+        with self._registry_lock:
+            instance_name, module_class = self._prepare_instance(
+                module_name, loaded_by, kwargs, instance_name, suffix)
+        construction = Future()
+        try:
+            construction.set_result(self._construct_instance(module_class,
+                                                             instance_name,
+                                                             kwargs))
+        except Exception as ex:
+            construction.set_exception(ex)
+
+        with self._registry_lock:
+            self._finish_construction(instance_name, construction)
+        return instance_name
+
+    def _prepare_instance(self, module_name, loaded_by, kwargs,
+                          instance_name=None, suffix=None):
+        """Reserve the instance name and get the class to instantiate.
+
+        Must be called holding the registry lock. Returns the instance name
+        and the plugin class
+        Args
+        ----
+        module_name: str
+            Plugin type
+        loaded_by: str
+            Instance that requested this to be loaded
+        kwargs: dict
+            Arguments passed to plugin, completed with plugmgr and loaded_by
+        instance_name: str
+            Name to use instead of picking one, see _claim_instance_name
+        suffix: list
+            Base name and automatic suffix the given name was built from
+        """
+        if instance_name is None:
+            instance_name = self._reserve_instance_name(module_name, kwargs)
+        else:
+            self._claim_instance_name(module_name, instance_name, suffix)
+        self._pending_instances[instance_name] = module_name
+
+        # insert self object in kwargs for now, for manipulation
+        kwargs.update({'plugmgr': self,
+                       'loaded_by': loaded_by})
+
+        try:
+            module_class = self._get_module_class(module_name)
+            validator = module_class.get_kwargs_validator()
+            error = validator.check(kwargs)
+            if error is not None:
+                raise ModuleLoadError(error[1], module_name)
+            validator.apply_defaults(kwargs)
+        except Exception:
+            self._pending_instances.pop(instance_name)
+            self._release_suffix(instance_name)
+            raise
+
+        self._take_standby(module_name, module_class, kwargs)
+        return instance_name, module_class
+
+    def configure_standby_pool(self, module_name, size):
+        """Keep standby objects prepared ahead of loads of a plugin type.
+
+        The device-independent setup of the plugin (its module_standby
+        class method) runs in the background, loads only bind the
+        device-specific arguments. A size of 0 disables the pool
+        Args
+        ----
+        module_name: str
+            Plugin type, must allow multiple instances
+        size: int
+            Number of standby objects to keep ready
+        """
+        with self._registry_lock:
+            if module_name not in self.found_modules:
+                raise ModuleLoadError('invalid module name: "{}"'
+                                      .format(module_name))
+            if ModuleCapabilities.MultiInstanceAllowed not in\
+               self.found_modules[module_name].get_capabilities():
+                raise ModuleLoadError('standby pools need multiple '
+                                      'instances to be allowed',
+                                      module_name)
+
+            if size <= 0:
+                self._standby_pools.pop(module_name, None)
+                return
+
+            module_class = self._get_module_class(module_name)
+            pool = self._standby_pools.get(module_name)
+            if pool is None or pool.module_class is not module_class:
+                pool = StandbyPool(module_class, size)
+                self._standby_pools[module_name] = pool
+            else:
+                pool.size = size
 
-        self.discovery_active = False
+        self._fill_standby_pool(module_name, pool)
 
-    def discover_modules(self):
-        """Discovery routine wrapper.
+    def get_standby_pool_status(self, module_name):
+        """Return the size of the standby pool of a plugin type.
 
-        Iterates through all found files in the plugins subfolder
+        Args
+        ----
+        module_name: str
+            Plugin type
         """
-        module_root = imp.load_source('plugins', os.path.join(self.plugin_path,
-                                                              '__init__.py'))
-        module_list = module_root.MODULES
+        if module_name not in self._standby_pools:
+            return {'size': 0, 'ready': 0}
 
-        for module in module_list:
-            self._module_discovery(module)
+        return self._standby_pools[module_name].get_status()
 
-        if len(self.deferred_discoveries) > 0:
-            self.logger.warning('some modules could not be discovered because'
-                                ' they had dependencies that were not met: {}'
-                                .format(
-                                    list(self.deferred_discoveries.keys())))
+    def _fill_standby_pool(self, module_name, pool):
+        """Build the missing standby objects of a pool in the background.
 
-    def _discover_script(self, script):
-        """Discovery process of a single script.
+        Args
+        ----
+        module_name: str
+            Plugin type
+        pool: StandbyPool
+            The pool
+        """
+        def fill():
+            try:
+                pool.fill_one()
+            except Exception as ex:
+                self.logger.error('could not prepare standby "{}": {}'
+                                  .format(module_name, ex))
+
+        for _ in range(pool.claim_missing()):
+            self._get_load_executor().submit(fill)
+
+    def _take_standby(self, module_name, module_class, kwargs):
+        """Pass a standby object to a constructor, if one is ready.
 
+        Must be called holding the registry lock
         Args
         ----
-        script: str
-            script file path
+        module_name: str
+            Plugin type
+        module_class: class
+            Plugin class about to be instantiated
+        kwargs: dict
+            Arguments passed to plugin, completed with standby
         """
-        try:
-            self.scripts[script] = ModuleManagerScript(script,
-                                                       self,
-                                                       initialize=True)
-        except DeferScriptLoading as ex:
-            self.logger.debug('deferring load of script {}, '
-                              'which requires module {} to be active'
-                              .format(script, str(ex)))
-            # put on deferred list
-            if ex.message['type'] not in self.deferred_scripts:
-                self.deferred_scripts[ex.message['type']] =\
-                    {script: {'req_inst': ex.message['inst']}}
-            else:
-                self.deferred_scripts[ex.message['type']].update(
-                    {script: {'req_inst': ex.message['inst']}})
-        except CancelScriptLoading as ex:
-            self.logger.info('loading of script {} was canceled'
-                             ' by the script with: {}'
-                             .format(script, ex))
-        except Exception as ex:
-            self.logger.warning('failed to load script {} with: {}'
-                                .format(script, ex))
+        pool = self._standby_pools.get(module_name)
+        if pool is None or 'standby' in kwargs:
+            return
 
-    def discover_scripts(self):
-        """Discover available scripts."""
-        script_files = glob.glob(os.path.join(self.script_path, '*.py'))
+        if pool.module_class is not module_class:
+            # plugin was rediscovered, older standby objects are dropped
+            pool = StandbyPool(module_class, pool.size)
+            self._standby_pools[module_name] = pool
 
-        for script in script_files:
-            self._discover_script(script)
+        found, standby = pool.take()
+        if found:
+            kwargs['standby'] = standby
+        self._fill_standby_pool(module_name, pool)
 
-    def _is_module_type_present(self, module_class_name):
-        """Return whether any module of a certain type has been loaded.
+    def _finish_construction(self, instance_name, construction):
+        """Register a constructed instance, or release its name.
 
+        Must be called holding the registry lock
         Args
         ----
-        module_class_name: string
-            Module type
+        instance_name: str
+            Reserved instance name
+        construction: Future
+            Finished construction, holding the instance
         """
-        for mod_name, mod_obj in self.loaded_modules.items():
-            if mod_obj.get_module_type() == module_class_name:
-                return True
+        self._pending_instances.pop(instance_name, None)
+        if construction.exception() is not None:
+            self._release_suffix(instance_name)
+            raise construction.exception()
 
-        return False
+        self._register_instance(instance_name, construction.result())
 
-    def load_module(self, module_name, **kwargs):
-        """Load module by type name, with named arguments.
+    def _instance_name_taken(self, instance_name):
+        """Tell whether an instance name is loaded or being loaded.
 
         Args
         ----
-        module_name: str
-            Plugin name
-        kwargs: dict
-            Arguments passed to plugin
+        instance_name: str
+            Instance name
         """
-        self.logger.info('Trying to load module '
-                         'of type "{}"'.format(module_name))
-        return self._load_module(module_name, **kwargs)
+        return instance_name in self.loaded_modules or\
+            instance_name in self._pending_instances
 
-    def _load_module(self, module_name, loaded_by='modman', **kwargs):
-        """Load a module that has been previously discovered.
+    def _reserve_instance_name(self, module_name, kwargs):
+        """Check that a module can be loaded and pick the instance name.
 
         Args
         ----
         module_name: str
             Plugin type
-        loaded_by: str
-            Instance that requested this to be loaded
         kwargs: dict
             Arguments passed to plugin
         """
@@ -475,70 +1861,231 @@ class ModuleManager(object):
         if 'instance_suffix' in kwargs:
             instance_name += '-{}'.format(kwargs['instance_suffix'])
 
-        # insert self object in kwargs for now, for manipulation
-        kwargs.update({'plugmgr': self,
-                       'loaded_by': loaded_by})
-
         # check if module type allows multiple instances
-        if self._is_module_type_present(module_name):
-            if ModuleCapabilities.MultiInstanceAllowed not in\
-               self.found_modules[module_name].get_capabilities():
+        if ModuleCapabilities.MultiInstanceAllowed not in\
+           self.found_modules[module_name].get_capabilities():
+            if self._is_module_type_present(module_name) or\
+               module_name in self._pending_instances.values():
                 raise ModuleAlreadyLoadedError('module is already loaded')
 
-        if instance_name in self.loaded_modules:
-            # handle multiple instances, append proper
-            # suffix to the type name automatically
-            if self.found_modules[module_name].get_multi_inst_suffix() is None:
-                loaded_module_list = self.loaded_modules.keys()
-                multi_inst_name = '{}-{}'.format(instance_name,
-                                                 handle_multiple_instance(
-                                                     instance_name,
-                                                     loaded_module_list))
-            else:
-                # get multi instance suffix
-                mi_s = self.found_modules[module_name].get_multi_inst_suffix()
-                multi_inst_name = '{}-{}'.format(instance_name,
-                                                 mi_s)
-
-            # instantiate plugin
-            module_class = self.found_modules[module_name]
-            module_inst = module_class(module_id=multi_inst_name,
-                                       handler=self.module_handler,
-                                       **kwargs)
-            self.loaded_modules[multi_inst_name] = module_inst
-            self.logger.info('Loaded module "{}" as "{}", loaded by "{}"'
-                             .format(module_name, multi_inst_name, loaded_by))
-            self._trigger_manager_hook('modman.module_loaded',
-                                       instance_name=multi_inst_name)
-            return multi_inst_name
+        if not self._instance_name_taken(instance_name):
+            return instance_name
+
+        # handle multiple instances, append proper
+        # suffix to the type name automatically
+        if self.found_modules[module_name].get_multi_inst_suffix() is None:
+            if instance_name not in self._suffix_allocators:
+                self._suffix_allocators[instance_name] =\
+                    InstanceSuffixAllocator(self.reuse_instance_suffixes)
+            suffix = self._suffix_allocators[instance_name].allocate(
+                instance_name, self._instance_name_taken)
+            multi_inst_name = '{}-{}'.format(instance_name, suffix)
+            self._allocated_suffixes[multi_inst_name] = (instance_name,
+                                                         suffix)
+        else:
+            # get multi instance suffix
+            mi_s = self.found_modules[module_name].get_multi_inst_suffix()
+            multi_inst_name = '{}-{}'.format(instance_name,
+                                             mi_s)
+
+        return multi_inst_name
+
+    def _claim_instance_name(self, module_name, instance_name, suffix=None):
+        """Check that a module can be loaded under a given name.
+
+        Args
+        ----
+        module_name: str
+            Plugin type
+        instance_name: str
+            Instance name
+        suffix: list
+            Base name and automatic suffix the name was built from, they
+            are marked as allocated
+        """
+        if module_name not in self.found_modules:
+            raise ModuleLoadError('invalid module name: "{}"'
+                                  .format(module_name))
+
+        if ModuleCapabilities.MultiInstanceAllowed not in\
+           self.found_modules[module_name].get_capabilities():
+            if self._is_module_type_present(module_name) or\
+               module_name in self._pending_instances.values():
+                raise ModuleAlreadyLoadedError('module is already loaded')
+
+        if self._instance_name_taken(instance_name):
+            raise ModuleAlreadyLoadedError('instance name is in use: "{}"'
+                                           .format(instance_name))
 
-        # load (create object)
-        mod_inst = self.found_modules[module_name](module_id=instance_name,
-                                                   handler=self.module_handler,
-                                                   **kwargs)
+        if suffix is not None:
+            base_name, number = suffix
+            if base_name not in self._suffix_allocators:
+                self._suffix_allocators[base_name] =\
+                    InstanceSuffixAllocator(self.reuse_instance_suffixes)
+            self._suffix_allocators[base_name].claim(number)
+            self._allocated_suffixes[instance_name] = (base_name, number)
+
+    def _release_suffix(self, instance_name):
+        """Give back the automatically allocated suffix of an instance.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        """
+        if instance_name in self._allocated_suffixes:
+            base_name, suffix = self._allocated_suffixes.pop(instance_name)
+            self._suffix_allocators[base_name].release(suffix)
+
+    def _construct_instance(self, module_class, instance_name, kwargs):
+        """Call the constructor of a plugin class.
+
+        Args
+        ----
+        module_class: class
+            Plugin class
+        instance_name: str
+            Final instance name
+        kwargs: dict
+            Arguments passed to plugin, including plugmgr and loaded_by
+        """
+        with self.profiler.span('construct', instance_name):
+            return module_class(module_id=instance_name,
+                                handler=self.module_handler,
+                                **kwargs)
+
+    def _register_instance(self, instance_name, mod_inst):
+        """Add a created instance to the loaded instances.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        mod_inst: Module
+            The instance
+        """
         self.loaded_modules[instance_name] = mod_inst
+        self._instances_by_type.setdefault(mod_inst.get_module_type(),
+                                           {})[instance_name] = None
+        self._children.setdefault(mod_inst.get_loaded_kwargs('loaded_by'),
+                                  {})[instance_name] = None
 
         self.logger.info('Loaded module "{}" as "{}", loaded by "{}"'
-                         .format(module_name, instance_name, loaded_by))
-        # trigger hooks
-        self._trigger_manager_hook('modman.module_loaded',
-                                   instance_name=instance_name)
+                         .format(mod_inst.get_module_type(), instance_name,
+                                 mod_inst.get_loaded_kwargs('loaded_by')))
 
-        # look for scripts that have been deferred from loading
-        for mod_name, script_list in self.deferred_scripts.items():
-            for script_path, attrs in script_list.items():
-                if mod_name == module_name:
-                    # check if specific instance is needed
-                    if attrs['req_inst'] != '':
-                        if instance_name == '{}-{}'.format(mod_name,
-                                                           attrs['req_inst']):
-                            # requirements met, load script
-                            self._discover_script(script_path)
-                        elif instance_name == attrs['req_inst']:
-                            # not multi instance
-                            self._discover_script(script_path)
+    def snapshot(self, filename):
+        """Save discovered plugins, instances and deferred scripts to a file.
 
-        return instance_name
+        Arguments that cannot be stored (live objects) are left out
+        Args
+        ----
+        filename: str
+            Snapshot file path
+        """
+        plugins = {}
+        for plugin, module_type in self._plugin_types.items():
+            module_class = self.found_modules.get(module_type)
+            if module_class is None:
+                continue
+            if isinstance(module_class, ModuleStub):
+                plugins[plugin] = module_class.entry
+                continue
+
+            info = self._plugin_discovery_info.get(plugin,
+                                                   {'cacheable': False,
+                                                    'requires': []})
+            try:
+                plugins[plugin] = describe_plugin(plugin, self.plugin_source,
+                                                  module_class, **info)
+            except (IOError, OSError) as ex:
+                self.logger.warning('could not describe plugin "{}": {}'
+                                    .format(plugin, ex))
+
+        instances = []
+        for instance_name, instance in self.loaded_modules.items():
+            module_type, loaded_by, kwargs = self._reload_arguments(instance)
+            kwargs, dropped = storable_kwargs(kwargs)
+            if len(dropped) > 0:
+                self.logger.warning('arguments {} of "{}" cannot be stored'
+                                    .format(dropped, instance_name))
+            instances.append({'name': instance_name,
+                              'type': module_type,
+                              'loaded_by': loaded_by,
+                              'kwargs': kwargs,
+                              'suffix': self._allocated_suffixes.get(
+                                  instance_name)})
+
+        write_snapshot(filename, {'plugins': plugins,
+                                  'instances': instances,
+                                  'deferred_scripts': self.deferred_scripts})
+
+    def restore(self, filename):
+        """Rebuild manager state from a snapshot.
+
+        Plugins whose files did not change since the snapshot are not
+        imported until used, and instances are created again under the
+        same names, loaders first; instances that a restored constructor
+        loads again are not restored a second time. Scripts are not run:
+        the instances they loaded are restored directly, while scripts
+        that were still waiting on a module run once it is restored.
+        Returns the restored instance names
+        Args
+        ----
+        filename: str
+            Snapshot file path
+        """
+        data = read_snapshot(filename)
+        if len(self.loaded_modules) > 0:
+            raise SnapshotError('cannot restore with instances loaded')
+
+        self.plugin_source.refresh()
+        for plugin, entry in data['plugins'].items():
+            if entry['cacheable'] and\
+               entry_is_current(entry, self.plugin_source):
+                self._inspected_entries[plugin] = entry
+        self.discover_modules()
+
+        for script, instance_names in data['deferred_scripts'].items():
+            self._defer_script(script, instance_names)
+
+        restored = []
+        # types of the children loaded again by restored constructors
+        reloaded = {}
+        skipped = set()
+        for instance in dependency_order(data['instances']):
+            parent = instance['loaded_by']
+            if parent in skipped:
+                # its loader was loaded again, and with it its children
+                skipped.add(instance['name'])
+                continue
+            if instance['type'] in reloaded.get(parent, ()):
+                reloaded[parent].remove(instance['type'])
+                skipped.add(instance['name'])
+                continue
+            if instance['name'] in self.loaded_modules:
+                continue
+
+            kwargs = dict(instance['kwargs'])
+            try:
+                instance_name = self._instantiate(instance['type'], parent,
+                                                  kwargs, instance['name'],
+                                                  instance.get('suffix'))
+            except Exception as ex:
+                self.logger.error('could not restore instance "{}": {}'
+                                  .format(instance['name'], ex))
+                continue
+            with self._registry_lock:
+                reloaded[instance_name] =\
+                    [self.loaded_modules[child].get_module_type()
+                     for child in self._children.get(instance_name, ())
+                     if child in self.loaded_modules]
+            self._trigger_manager_hook('modman.module_loaded',
+                                       instance_name=instance_name)
+            restored.append(instance_name)
+
+        self._wake_deferred_scripts(*restored)
+        return restored
 
     def get_loaded_module_list(self):
         """Return a list of the loaded instance names."""
@@ -552,12 +2099,7 @@ class ModuleManager(object):
         module_type: str
             Plugin type
         """
-        instances = []
-        for inst_name, mod in self.loaded_modules.items():
-            if mod.get_module_type() == module_type:
-                instances.append(inst_name)
-
-        return instances
+        return list(self._instances_by_type.get(module_type, ()))
 
     def get_instance_type(self, instance_name):
         """Return module type or descriptive error.
@@ -776,9 +2318,219 @@ class ModuleManager(object):
         """
         self._unload_module(module_name)
 
+    def get_instance_children(self, instance_name):
+        """Return the instances loaded by an instance.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        """
+        return list(self._children.get(instance_name, ()))
+
+    def unload_tree(self, instance_name):
+        """Unload an instance and, first, everything it loaded.
+
+        Instances are torn down leaves first, one level at a time; the
+        module_unload calls of a level run concurrently. Instances of
+        plugin types with an unload deadline are detached, see
+        set_unload_deadline, so a level waits at most for the longest
+        deadline. Returns the unloaded instance names, in order
+        Args
+        ----
+        instance_name: str
+            Root instance name
+        """
+        with self._registry_lock:
+            if instance_name not in self.loaded_modules:
+                raise ModuleNotLoadedError('cant unload {}: module not loaded'
+                                           .format(instance_name))
+            levels = self._teardown_levels(instance_name)
+
+        unloaded = []
+        executor = self._get_unload_executor()
+        for level in levels:
+            detached = []
+            with self._registry_lock:
+                level = [name for name in level
+                         if name in self.loaded_modules]
+                for name in level:
+                    deadline = self._unload_deadlines.get(
+                        self.loaded_modules[name].get_module_type())
+                    if deadline is not None:
+                        detached.append(self._detach_instance(name, 'modman',
+                                                              deadline))
+                        unloaded.append(name)
+                level = [name for name in level
+                         if name in self.loaded_modules]
+                instances = [self.loaded_modules[name] for name in level]
+
+            # without holding the lock, module_unload may call the manager
+            teardowns = [executor.submit(instance.module_unload)
+                         for instance in instances]
+            futures_wait(teardowns + detached)
+
+            with self._registry_lock:
+                for name, teardown in zip(level, teardowns):
+                    if teardown.exception() is not None:
+                        self.logger.error('unloading of "{}" failed with: {}'
+                                          .format(name,
+                                                  teardown.exception()))
+                    if name in self.loaded_modules:
+                        self._remove_instance(name, 'modman')
+                        unloaded.append(name)
+            self._deliver_notifications()
+
+        return unloaded
+
+    def _teardown_levels(self, instance_name):
+        """Group an instance tree by height, leaves first.
+
+        Must be called holding the registry lock
+        Args
+        ----
+        instance_name: str
+            Root instance name
+        """
+        heights = {}
+
+        def height(name, visiting):
+            if name in heights:
+                return heights[name]
+            visiting.add(name)
+            children = [child for child in self._children.get(name, ())
+                        if child not in visiting and
+                        child in self.loaded_modules]
+            heights[name] = max([height(child, visiting) + 1
+                                 for child in children] + [0])
+            return heights[name]
+
+        levels = [[] for _ in range(height(instance_name, set()) + 1)]
+        for name, name_height in heights.items():
+            levels[name_height].append(name)
+
+        return levels
+
     def _unload_module(self, module_name, requester='modman'):
         """Unload a module and automatically cleanup after it.
 
+        Args
+        ----
+        module_name: str
+            Instance name
+        requester: str
+            Name of instance which requested the unloading procedure
+        """
+        with self._registry_lock:
+            deadline = None
+            if module_name in self.loaded_modules:
+                deadline = self._unload_deadlines.get(
+                    self.loaded_modules[module_name].get_module_type())
+            if deadline is not None:
+                self._detach_instance(module_name, requester, deadline)
+
+        if deadline is None:
+            self._unload_instance(module_name, requester)
+        self._deliver_notifications()
+
+    def set_unload_deadline(self, module_name, deadline):
+        """Unload instances of a plugin type asynchronously.
+
+        Instances are detached right away; module_unload runs in the
+        background and is abandoned with a warning after the deadline
+        Args
+        ----
+        module_name: str
+            Plugin type
+        deadline: float
+            Seconds, None restores synchronous unloading
+        """
+        if deadline is None:
+            self._unload_deadlines.pop(module_name, None)
+        else:
+            self._unload_deadlines[module_name] = deadline
+
+    def submit_unload_module(self, module_name, deadline=None):
+        """Detach an instance and run its module_unload in the background.
+
+        Returns a future resolving to True once module_unload returns,
+        or to False if it raised or was abandoned after the deadline
+        Args
+        ----
+        module_name: str
+            Instance name
+        deadline: float
+            Seconds, defaults to the deadline of the plugin type, if any
+        """
+        with self._registry_lock:
+            if deadline is None and module_name in self.loaded_modules:
+                deadline = self._unload_deadlines.get(
+                    self.loaded_modules[module_name].get_module_type())
+            future = self._detach_instance(module_name, 'modman', deadline)
+
+        self._deliver_notifications()
+        return future
+
+    def _detach_instance(self, module_name, requester, deadline):
+        """Remove an instance now, finish its unloading in the background.
+
+        Called holding the registry lock. Returns a future, see
+        submit_unload_module
+        Args
+        ----
+        module_name: str
+            Instance name
+        requester: str
+            Name of instance which requested the unloading procedure
+        deadline: float
+            Seconds, None waits for module_unload forever
+        """
+        the_module = self._check_unload(module_name, requester)
+        self._remove_instance(module_name, requester)
+
+        future = Future()
+        state_lock = threading.Lock()
+
+        def teardown():
+            try:
+                the_module.module_unload()
+                result = True
+            except Exception as ex:
+                self.logger.error('unloading of "{}" failed with: {}'
+                                  .format(module_name, ex))
+                result = False
+            with state_lock:
+                if future.done():
+                    self.logger.info('abandoned unloading of "{}" finished'
+                                     .format(module_name))
+                    return
+                future.set_result(result)
+
+        def abandon():
+            with state_lock:
+                if future.done():
+                    return
+                self.logger.warning('unloading of "{}" exceeded its deadline '
+                                    'of {}s, abandoned'
+                                    .format(module_name, deadline))
+                future.set_result(False)
+
+        # daemon threads, a stuck module_unload must not block exit
+        worker = threading.Thread(target=teardown,
+                                  name='viscum-unload-{}'.format(module_name))
+        worker.daemon = True
+        worker.start()
+        if deadline is not None:
+            timer = threading.Timer(deadline, abandon)
+            timer.daemon = True
+            timer.start()
+            future.add_done_callback(lambda _: timer.cancel())
+
+        return future
+
+    def _check_unload(self, module_name, requester):
+        """Check that an instance can be unloaded, and return it.
+
         Args
         ----
         module_name: str
@@ -789,6 +2541,9 @@ class ModuleManager(object):
         if module_name not in self.loaded_modules:
             raise ModuleNotLoadedError('cant unload {}: module not loaded'
                                        .format(module_name))
+        if module_name in self._unloading:
+            raise ModuleNotLoadedError('cant unload {}: already unloading'
+                                       .format(module_name))
 
         the_module = self.loaded_modules[module_name]
         if requester != the_module.get_loaded_kwargs('loaded_by'):
@@ -796,66 +2551,155 @@ class ModuleManager(object):
                 raise CannotUnloadError('cannot unloaded: forbidden'
                                         ' by module manager')
 
+        return the_module
+
+    def _unload_instance(self, module_name, requester):
+        """Unload procedure, called without holding the registry lock.
+
+        module_unload runs before the instance is removed, the lock is
+        only taken to check and to remove it
+        Args
+        ----
+        module_name: str
+            Instance name
+        requester: str
+            Name of instance which requested the unloading procedure
+        """
+        with self._registry_lock:
+            the_module = self._check_unload(module_name, requester)
+            self._unloading.add(module_name)
+
         # do unloading procedure
-        the_module.module_unload()
-
-        # remove custom hooks
-        remove_hooks = []
-        for hook_name, hook in self.custom_hooks.items():
-            if hook.owner == module_name:
-                remove_hooks.append(hook_name)
-
-        for hook in remove_hooks:
-            # notify attached
-            for attached in self.custom_hooks[hook].attached_callbacks:
-                if attached.argument in self.loaded_modules:
-                    att_arg = self.loaded_modules[attached.argument]
-                    att_arg.handler_communicate(reason='provider_unloaded')
-
-            del self.custom_hooks[hook]
-            self.logger.debug('removing custom hook: "{}"'.format(hook))
-
-        # remove custom methods
-        remove_methods = []
-        for method_name, method in self.custom_methods.items():
-            if method.owner == module_name:
-                remove_methods.append(method_name)
-
-        for method in remove_methods:
-            del self.custom_methods[method]
-            self.logger.debug('removing custom method: "{}"'.format(method))
-
-        # remove interrupt handlers
-        remove_interrupts = []
-        for interrupt_name, interrupt in self.external_interrupts.items():
-            if interrupt.owner == module_name:
-                remove_interrupts.append(interrupt_name)
-
-        for interrupt in remove_interrupts:
-            del self.external_interrupts[interrupt]
-            self.logger.debug('removing interrupt handler: "{}"'
-                              .format(interrupt))
+        try:
+            the_module.module_unload()
+        finally:
+            with self._registry_lock:
+                self._unloading.discard(module_name)
 
-        # detach hooks
-        for hook_name, hook in self.custom_hooks.items():
-            for attached in hook.find_callback_by_argument(module_name):
-                hook.detach_callback(attached)
+        with self._registry_lock:
+            self._remove_instance(module_name, requester)
+
+    def _remove_instance(self, module_name, requester):
+        """Drop an instance and everything it registered.
 
-        for hook_name, hook in self.attached_hooks.items():
-            for attached in hook.find_callback_by_argument(module_name):
-                hook.detach_callback(attached)
+        Called holding the registry lock
+        Args
+        ----
+        module_name: str
+            Instance name
+        requester: str
+            Name of instance which requested the unloading procedure
+        """
+        the_module = self.loaded_modules[module_name]
+        self._drop_registrations(module_name)
 
         # remove
         del self.loaded_modules[module_name]
+        module_type = the_module.get_module_type()
+        type_instances = self._instances_by_type[module_type]
+        del type_instances[module_name]
+        if len(type_instances) == 0:
+            del self._instances_by_type[module_type]
+        self._release_suffix(module_name)
+        parent = the_module.get_loaded_kwargs('loaded_by')
+        siblings = self._children.get(parent)
+        if siblings is not None:
+            siblings.pop(module_name, None)
+            if len(siblings) == 0:
+                del self._children[parent]
 
         self.logger.info('module "{}" unloaded by "{}"'
                          .format(module_name, requester))
 
+    def _deliver_notifications(self):
+        """Tell owners of callbacks that the hook provider was unloaded.
+
+        Called after releasing the registry lock
+        """
+        while True:
+            try:
+                owner = self._notifications.popleft()
+            except IndexError:
+                return
+            try:
+                owner.handler_communicate(reason='provider_unloaded')
+            except Exception as ex:
+                self.logger.error('failed to notify "{}" of an unloaded '
+                                  'provider with: {}'
+                                  .format(owner._registered_id, ex))
+
+    def _drop_registrations(self, module_name):
+        """Remove the hooks, methods, interrupts and callbacks of an instance.
+
+        Must be called holding the registry lock
+        Args
+        ----
+        module_name: str
+            Instance name
+        """
+        owned = list(self._owner_registrations.pop(module_name, {}))
+
+        # remove custom hooks, methods and interrupt handlers
+        for registration in owned:
+            kind, name = registration[:2]
+            if kind == 'custom_hook' and name in self.custom_hooks and\
+               self.custom_hooks[name].owner == module_name:
+                # notify attached, see _deliver_notifications
+                for attached in self.custom_hooks[name].attached_callbacks:
+                    if attached.argument in self.loaded_modules:
+                        self._notifications.append(
+                            self.loaded_modules[attached.argument])
+
+                del self.custom_hooks[name]
+                self.logger.debug('removing custom hook: "{}"'.format(name))
+            elif kind == 'custom_method' and name in self.custom_methods and\
+                    self.custom_methods[name].owner == module_name:
+                del self.custom_methods[name]
+                self.logger.debug('removing custom method: "{}"'
+                                  .format(name))
+            elif kind == 'interrupt' and name in self.external_interrupts and\
+                    self.external_interrupts[name].owner == module_name:
+                del self.external_interrupts[name]
+                self.logger.debug('removing interrupt handler: "{}"'
+                                  .format(name))
+
+        # detach hooks
+        for registration in owned:
+            kind, name = registration[:2]
+            if kind == 'custom_hook_callback' and name in self.custom_hooks:
+                self.custom_hooks[name].detach_callback(registration[2])
+            elif kind == 'manager_hook_callback':
+                self.attached_hooks[name].detach_callback(registration[2])
+
     def list_discovered_modules(self):
         """Return a list of all module types that have been discovered."""
         return dict([(name, mod.get_module_desc())
                      for name, mod in self.found_modules.items()])
 
+    def _report_handler_failure(self, which_module, reason, exception):
+        """Tell an instance that a request it made failed.
+
+        Returns None, or an error if the instance is no longer loaded
+        (detached while unloading, for instance)
+        Args
+        ----
+        which_module: str
+            Name of the instance that made the request
+        reason: str
+            Failed operation
+        exception: Exception
+            What went wrong
+        """
+        the_module = self.loaded_modules.get(which_module)
+        if the_module is None:
+            self.logger.error('"{}" failed for "{}", which is not loaded: {}'
+                              .format(reason, which_module, exception))
+            return {'status': 'error',
+                    'error': 'invalid_instance'}
+
+        the_module.handler_communicate(reason=reason, exception=exception)
+        return None
+
     def module_handler(self, which_module, *args, **kwargs):
         """Carry out various operations.
 
@@ -896,11 +2740,8 @@ class ModuleManager(object):
                     self.logger.error('module "{}" tried to call '
                                       'invalid method: "{}"'
                                       .format(which_module, first_argument))
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='call_method_failed',
-                        exception=ex)
-                    return None
+                    return self._report_handler_failure(
+                        which_module, 'call_method_failed', ex)
 
             if kwg == 'attach_custom_hook':
                 if isinstance(value, (list, tuple)):
@@ -916,10 +2757,10 @@ class ModuleManager(object):
                     self.logger.error('module "{}" tried to attach '
                                       'to invalid hook: "{}"'
                                       .format(which_module, first_argument))
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='attach_hook_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'attach_hook_failed', ex)
+                    if reply is not None:
+                        return reply
 
             if kwg == 'attach_manager_hook':
                 if isinstance(value, (list, tuple)):
@@ -935,10 +2776,10 @@ class ModuleManager(object):
                     self.logger.error('module "{}" tried to attach '
                                       'to invalid hook: "{}"'
                                       .format(which_module, first_argument))
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='attach_hook_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'attach_hook_failed', ex)
+                    if reply is not None:
+                        return reply
 
             if kwg == 'load_module':
                 if isinstance(value, (list, tuple)):
@@ -952,64 +2793,77 @@ class ModuleManager(object):
                                              which_module,
                                              **second_argument)
                 except (ModuleLoadError, ModuleAlreadyLoadedError) as ex:
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='load_module_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'load_module_failed', ex)
+                    if reply is not None:
+                        return reply
+
+            if kwg == 'load_modules':
+                return self.load_modules(value, which_module)
 
             if kwg == 'unload_module':
                 try:
                     self._unload_module(value,
                                         which_module)
                 except (ModuleNotLoadedError, CannotUnloadError) as ex:
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='unload_module_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'unload_module_failed', ex)
+                    if reply is not None:
+                        return reply
 
             if kwg == 'install_custom_hook':
                 try:
                     self._install_custom_hook(value,
                                               which_module)
                 except HookAlreadyInstalledError as ex:
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='install_hook_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'install_hook_failed', ex)
+                    if reply is not None:
+                        return reply
 
             if kwg == 'install_custom_method':
+                weak = False
                 if isinstance(value, (list, tuple)):
                     first_argument = value[0]
                     second_argument = value[1]
+                    if len(value) > 2:
+                        weak = value[2]
                 elif isinstance(value, dict):
                     first_argument = value['method']
                     second_argument = value['callback']
+                    weak = value.get('weak', False)
                 try:
                     self._install_custom_method(first_argument,
                                                 second_argument,
-                                                which_module)
+                                                which_module,
+                                                weak)
                 except MethodAlreadyInstalledError as ex:
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='install_method_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'install_method_failed', ex)
+                    if reply is not None:
+                        return reply
 
             if kwg == 'install_interrupt_handler':
+                weak = False
                 if isinstance(value, (list, tuple)):
                     first_argument = value[0]
                     second_argument = value[1]
+                    if len(value) > 2:
+                        weak = value[2]
                 elif isinstance(value, dict):
                     first_argument = value['interrupt']
                     second_argument = value['callback']
+                    weak = value.get('weak', False)
                 try:
                     self._install_interrupt_handler(first_argument,
                                                     second_argument,
-                                                    which_module)
+                                                    which_module,
+                                                    weak)
                 except InterruptAlreadyInstalledError as ex:
-                    the_module = self.loaded_modules[which_module]
-                    the_module.handler_communicate(
-                        reason='install_interrupt_failed',
-                        exception=ex)
+                    reply = self._report_handler_failure(
+                        which_module, 'install_interrupt_failed', ex)
+                    if reply is not None:
+                        return reply
 
             if kwg == 'require_module_instance':
                 if value not in self.loaded_modules:
@@ -1060,32 +2914,15 @@ class ModuleManager(object):
         kwargs: dict
            Hook arguments
         """
+        self._prune_dead_callbacks(hook_dict, hook_name)
         for attached_callback in hook_dict[hook_name].attached_callbacks:
             try:
-                if attached_callback.callback(**kwargs):
-                    if attached_callback.action == MMHookAct.LOAD_MODULE:
-                        # load the module!
-                        self.logger.debug('some hook returned true, '
-                                          'loading module {}'
-                                          .format(attached_callback.argument))
-                        # module must accept same kwargs, this is mandatory
-                        # with this discovery event
-                        try:
-                            cb_arg = attached_callback.argument
-                            module_name = cb_arg.get_module_desc().arg_name
-                            self.load_module(module_name,
-                                             **kwargs)
-                        except Exception as ex:
-                            self.logger.error('loading of module of class '
-                                              '"{}" failed with: {}'
-                                              .format(cb_arg.__name__,
-                                                      str(ex)))
-                    elif attached_callback.action == MMHookAct.UNLOAD_MODULE:
-                        # unload the attached module
-                        self.logger.debug('a hook required module '
-                                          '{} to be unloaded'
-                                          .format(attached_callback.argument))
-                        self.unload_module(attached_callback.argument)
+                result = attached_callback.callback(**kwargs)
+                if inspect.iscoroutine(result):
+                    self._run_hook_coroutine(attached_callback, hook_name,
+                                             result, kwargs)
+                elif result:
+                    self._run_hook_action(attached_callback, kwargs)
             except Exception as ex:
                 self.logger.error('failed to call function '
                                   '{} attached to "{}" with: {}'
@@ -1093,6 +2930,65 @@ class ModuleManager(object):
                                           hook_name,
                                           str(ex)))
 
+    def _run_hook_coroutine(self, attached_callback, hook_name, coroutine,
+                            kwargs):
+        """Hand the coroutine returned by a hook callback to the runner.
+
+        Args
+        ----
+        attached_callback: HookAttacher
+            Callback that returned the coroutine
+        hook_name: str
+            Name of the triggered hook
+        coroutine: coroutine
+            Result of the callback
+        kwargs: dict
+            Hook arguments
+        """
+        if self.hook_coroutine_runner is None:
+            coroutine.close()
+            self.logger.error('function {} attached to "{}" is a coroutine, '
+                              'it needs an AsyncModuleManager to run'
+                              .format(attached_callback, hook_name))
+            return
+
+        self.hook_coroutine_runner(attached_callback, hook_name, coroutine,
+                                   kwargs)
+
+    def _run_hook_action(self, attached_callback, kwargs):
+        """Execute the action of a hook callback that returned true.
+
+        Args
+        ----
+        attached_callback: HookAttacher
+            The callback
+        kwargs: dict
+            Hook arguments
+        """
+        if attached_callback.action == MMHookAct.LOAD_MODULE:
+            # load the module!
+            self.logger.debug('some hook returned true, '
+                              'loading module {}'
+                              .format(attached_callback.argument))
+            # module must accept same kwargs, this is mandatory
+            # with this discovery event
+            try:
+                cb_arg = attached_callback.argument
+                module_name = cb_arg.get_module_desc().arg_name
+                self.load_module(module_name,
+                                 **kwargs)
+            except Exception as ex:
+                self.logger.error('loading of module of class '
+                                  '"{}" failed with: {}'
+                                  .format(cb_arg.__name__,
+                                          str(ex)))
+        elif attached_callback.action == MMHookAct.UNLOAD_MODULE:
+            # unload the attached module
+            self.logger.debug('a hook required module '
+                              '{} to be unloaded'
+                              .format(attached_callback.argument))
+            self.unload_module(attached_callback.argument)
+
     def trigger_custom_hook(self, hook_name, **kwargs):
         """Trigger an installed hook.
 
@@ -1128,4 +3024,7 @@ class ModuleManager(object):
             Keyword arguments
         """
         if interrupt_key in self.external_interrupts:
+            if is_dead(self.external_interrupts[interrupt_key].call):
+                self._drop_dead_interrupt(interrupt_key)
+                return
             self.external_interrupts[interrupt_key].call(**kwargs)
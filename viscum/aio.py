@@ -0,0 +1,402 @@
+"""asyncio interface to the module manager."""
+
+from viscum.hook import ModuleManagerHookActions as MMHookAct
+from viscum.plugin.exception import (ModuleMethodError,
+                                     ModulePropertyPermissionError,
+                                     ModuleInvalidPropertyError)
+from concurrent.futures import Future
+import asyncio
+import functools
+import inspect
+
+
+class AsyncModuleManager(object):
+    """Awaitable front-end of a ModuleManager.
+
+    Coroutine plugin methods, property getters and setters and hook
+    callbacks are awaited on the event loop; plain ones, and plugin
+    constructors, run in an executor so that the loop is never blocked.
+    A plugin class can finish its initialization asynchronously by
+    defining a module_load_async coroutine method, awaited before the
+    instance is registered.
+    """
+
+    def __init__(self, modman, executor=None, loop=None):
+        """Initialize.
+
+        Args
+        ----
+        modman: ModuleManager
+            Wrapped module manager
+        executor: concurrent.futures.Executor
+            Executor running blocking calls, the loop default if None
+        loop: asyncio.AbstractEventLoop
+            Event loop, the running loop of the first awaited call if None
+        """
+        self.modman = modman
+        self.executor = executor
+        self.loop = loop
+        modman.hook_coroutine_runner = self._schedule_hook_coroutine
+
+    def _get_loop(self):
+        """Return the event loop, binding the running one if needed."""
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+
+        return self.loop
+
+    async def _run_sync(self, function, *args, **kwargs):
+        """Run a blocking call in the executor.
+
+        Args
+        ----
+        function: function
+            Blocking function
+        args: list
+            Positional arguments
+        kwargs: dict
+            Keyword arguments
+        """
+        return await self._get_loop().run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs))
+
+    async def _dispatch(self, target, function, *args, **kwargs):
+        """Call a manager function that ends up calling a plugin function.
+
+        The call is made on the loop if the plugin function is a coroutine
+        function, in the executor otherwise; an awaitable result is awaited
+        Args
+        ----
+        target: function, NoneType
+            Plugin function that will be called
+        function: function
+            Manager function
+        args: list
+            Positional arguments
+        kwargs: dict
+            Keyword arguments
+        """
+        if inspect.iscoroutinefunction(target):
+            self._get_loop()
+            result = function(*args, **kwargs)
+        else:
+            result = await self._run_sync(function, *args, **kwargs)
+
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result
+
+    def _get_instance(self, instance_name):
+        """Return a loaded instance, or None.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        """
+        return self.modman.loaded_modules.get(instance_name)
+
+    async def load_module(self, module_name, loaded_by='modman', **kwargs):
+        """Load a module without blocking the event loop.
+
+        Returns the instance name
+        Args
+        ----
+        module_name: str
+            Plugin type
+        loaded_by: str
+            Instance that requested this to be loaded
+        kwargs: dict
+            Arguments passed to plugin
+        """
+        modman = self.modman
+        modman.logger.info('Trying to load module '
+                           'of type "{}"'.format(module_name))
+        with modman._registry_lock:
+            instance_name, module_class = modman._prepare_instance(
+                module_name, loaded_by, kwargs)
+
+        construction = Future()
+        try:
+            mod_inst = await self._run_sync(modman._construct_instance,
+                                            module_class, instance_name,
+                                            kwargs)
+        except Exception as ex:
+            construction.set_exception(ex)
+        else:
+            try:
+                module_load = getattr(mod_inst, 'module_load_async', None)
+                if module_load is not None:
+                    await module_load()
+            except Exception as ex:
+                await self._discard_instance(instance_name, mod_inst)
+                construction.set_exception(ex)
+            else:
+                construction.set_result(mod_inst)
+
+        with modman._registry_lock:
+            modman._finish_construction(instance_name, construction)
+
+        await self._trigger_hooks(modman.attached_hooks,
+                                  'modman.module_loaded',
+                                  instance_name=instance_name)
+
+        modman._wake_deferred_scripts(instance_name)
+
+        return instance_name
+
+    async def _discard_instance(self, instance_name, mod_inst):
+        """Undo the construction of an instance that failed to load.
+
+        Args
+        ----
+        instance_name: str
+            Reserved instance name
+        mod_inst: Module
+            Constructed instance, never registered
+        """
+        modman = self.modman
+        try:
+            await self._dispatch(mod_inst.module_unload,
+                                 mod_inst.module_unload)
+        except Exception as ex:
+            modman.logger.error('failed to unload "{}" after a failed load '
+                                'with: {}'.format(instance_name, str(ex)))
+
+        with modman._registry_lock:
+            modman._drop_registrations(instance_name)
+        modman._deliver_notifications()
+
+    async def unload_module(self, instance_name):
+        """Unload a module without blocking the event loop.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        """
+        await self._run_sync(self.modman.unload_module, instance_name)
+
+    async def get_module_property(self, instance_name, property_name):
+        """Return the value of a module property or descriptive error.
+
+        Args
+        ----
+        instance_name: str
+            Instance name
+        property_name: str
+            Name of the property requested
+        """
+        instance = self._get_instance(instance_name)
+        getter = None
+        if instance is not None and property_name in instance._properties:
+            getter = instance._properties[property_name].getter
+
+        return await self._dispatch(getter, self.modman.get_module_property,
+                                    instance_name, property_name)
+
+    async def set_module_property(self, instance_name, property_name, value):
+        """Set the value of a module property.
+
+        Returns status of the attempt
+        Args
+        ----
+        instance_name: str
+            Instance name
+        property_name: str
+            Name of requested property
+        value: object
+            Some value to be written
+        """
+        instance = self._get_instance(instance_name)
+        if instance is None or property_name not in instance._properties or\
+           not inspect.iscoroutinefunction(
+               instance._properties[property_name].setter):
+            return await self._run_sync(self.modman.set_module_property,
+                                        instance_name, property_name, value)
+
+        # the manager drops the setter result, so await it here
+        self._get_loop()
+        try:
+            result = instance.set_property_value(property_name, value)
+        except (ModulePropertyPermissionError, ModuleInvalidPropertyError):
+            # let the manager report the error
+            return self.modman.set_module_property(instance_name,
+                                                   property_name, value)
+        await result
+        return {'status': 'ok'}
+
+    async def call_module_method(self, __instance_name, __method_name,
+                                 **kwargs):
+        """Attempt calling a module method.
+
+        In case of failure returns a descriptive error
+        Args
+        ----
+        __instance_name: str
+            Name of instance
+        __method_name: str
+            Name of method
+        kwargs: dict
+            Keyword arguments passed to method
+        """
+        instance = self._get_instance(__instance_name)
+        method_call = None
+        if instance is not None and __method_name in instance._methods:
+            method_call = instance._methods[__method_name].method_call
+
+        try:
+            return await self._dispatch(method_call,
+                                        self.modman.call_module_method,
+                                        __instance_name, __method_name,
+                                        **kwargs)
+        except ModuleMethodError as e:
+            self.modman.logger.warn('call to method "{}" of instance '
+                                    '"{}" failed with: "{}"'
+                                    .format(__method_name,
+                                            __instance_name,
+                                            str(e)))
+            return {'status': 'error',
+                    'error': 'call_failed'}
+
+    async def trigger_custom_hook(self, hook_name, **kwargs):
+        """Trigger an installed hook and wait for all its callbacks.
+
+        Args
+        ----
+        hook_name: str
+           Hook name
+        kwargs: dict
+           Keyword arguments
+        """
+        await self._trigger_hooks(self.modman.custom_hooks, hook_name,
+                                  **kwargs)
+
+    async def module_system_tick(self):
+        """Timer function called by an asyncio main loop."""
+        modman = self.modman
+        await self._run_sync(modman.finish_background_loads)
+        modman.tick_counter += 1
+        await self._trigger_hooks(modman.attached_hooks, 'modman.tick',
+                                  uptime=modman.tick_counter)
+
+        if modman.rediscover_interval is not None and\
+           modman.tick_counter % modman.rediscover_interval == 0:
+            await self._run_sync(modman.rediscover,
+                                 reload_instances=modman.rediscover_reloads)
+
+    async def _trigger_hooks(self, hook_dict, hook_name, **kwargs):
+        """Call all callbacks attached to a hook, in attachment order.
+
+        Each callback is awaited, and its action executed, before the next
+        one is called, as synchronous triggers do
+        Args
+        ----
+        hook_dict: dict
+           Name-indexed dictionary of registered hooks
+        hook_name: str
+           Name of the hook to be triggered
+        kwargs: dict
+           Hook arguments
+        """
+        self.modman._prune_dead_callbacks(hook_dict, hook_name)
+        for attached_callback in list(hook_dict[hook_name].attached_callbacks):
+            try:
+                result = await self._dispatch(attached_callback.callback,
+                                              attached_callback.callback,
+                                              **kwargs)
+            except Exception as ex:
+                result = ex
+            await self._hook_result(attached_callback, hook_name, result,
+                                    kwargs)
+
+    async def _hook_result(self, attached_callback, hook_name, result,
+                           kwargs):
+        """Handle what a hook callback returned.
+
+        Args
+        ----
+        attached_callback: HookAttacher
+            The callback
+        hook_name: str
+            Name of the triggered hook
+        result: object
+            Callback result or raised exception
+        kwargs: dict
+            Hook arguments
+        """
+        modman = self.modman
+        if isinstance(result, Exception):
+            modman.logger.error('failed to call function '
+                                '{} attached to "{}" with: {}'
+                                .format(attached_callback, hook_name,
+                                        str(result)))
+            return
+
+        if not result:
+            return
+
+        if attached_callback.action == MMHookAct.LOAD_MODULE:
+            cb_arg = attached_callback.argument
+            try:
+                await self.load_module(cb_arg.get_module_desc().arg_name,
+                                       **kwargs)
+            except Exception as ex:
+                modman.logger.error('loading of module of class '
+                                    '"{}" failed with: {}'
+                                    .format(cb_arg.__name__, str(ex)))
+        elif attached_callback.action == MMHookAct.UNLOAD_MODULE:
+            try:
+                await self.unload_module(attached_callback.argument)
+            except Exception as ex:
+                modman.logger.error('failed to unload "{}" from "{}" '
+                                    'with: {}'
+                                    .format(attached_callback.argument,
+                                            hook_name, str(ex)))
+
+    async def _await_hook_coroutine(self, attached_callback, hook_name,
+                                    coroutine, kwargs):
+        """Await a coroutine returned to a synchronous hook trigger.
+
+        Args
+        ----
+        attached_callback: HookAttacher
+            Callback that returned the coroutine
+        hook_name: str
+            Name of the triggered hook
+        coroutine: coroutine
+            Result of the callback
+        kwargs: dict
+            Hook arguments
+        """
+        try:
+            result = await coroutine
+        except Exception as ex:
+            result = ex
+        await self._hook_result(attached_callback, hook_name, result, kwargs)
+
+    def _schedule_hook_coroutine(self, attached_callback, hook_name,
+                                 coroutine, kwargs):
+        """Run on the loop a coroutine returned to ModuleManager hooks.
+
+        Hooks triggered synchronously do not wait for it
+        Args
+        ----
+        attached_callback: HookAttacher
+            Callback that returned the coroutine
+        hook_name: str
+            Name of the triggered hook
+        coroutine: coroutine
+            Result of the callback
+        kwargs: dict
+            Hook arguments
+        """
+        if self.loop is None:
+            coroutine.close()
+            raise RuntimeError('no event loop bound to AsyncModuleManager')
+
+        asyncio.run_coroutine_threadsafe(
+            self._await_hook_coroutine(attached_callback, hook_name,
+                                       coroutine, dict(kwargs)),
+            self.loop)
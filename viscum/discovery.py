@@ -0,0 +1,359 @@
+"""Plugin sources, discovery scheduling and isolated plugin inspection."""
+
+from collections import deque
+from viscum.manifest import describe_plugin, stat_plugin, hash_plugin
+from viscum.pack import PluginPack
+import imp
+import os
+import zipfile
+
+
+class ManagerInteraction(Exception):
+    """Plugin used the module manager while being inspected."""
+
+    pass
+
+
+class DiscoveryRecorder(object):
+    """Stand-in module manager passed to plugins inspected in isolation.
+
+    Only records discovery-time requirements; any other use of the
+    manager means the plugin has to be discovered by the real one.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self.requires = []
+
+    def require_discovered_module(self, *module_types):
+        """Record required module types.
+
+        Args
+        ----
+        module_types: list
+            Types of the required modules
+        """
+        self.requires.extend(module_types)
+
+    def __getattr__(self, name):
+        """Refuse everything else.
+
+        Args
+        ----
+        name: str
+            Attribute name
+        """
+        raise ManagerInteraction(name)
+
+
+class PluginDirectory(object):
+    """Plugin source backed by a plugins folder."""
+
+    def __init__(self, path):
+        """Initialize.
+
+        Args
+        ----
+        path: str
+            Plugins folder path
+        """
+        self.path = path
+
+    def refresh(self):
+        """Nothing to do, the folder is read every time."""
+        pass
+
+    def list_plugins(self):
+        """Return the names of the plugins in the folder.
+
+        A folder may still list its plugins in the MODULES attribute of
+        its own __init__.py; otherwise every sub-folder holding an
+        __init__.py is a plugin.
+        """
+        root_file = os.path.join(self.path, '__init__.py')
+        if os.path.isfile(root_file):
+            module_root = imp.load_source('plugins', root_file)
+            return [module for module in module_root.MODULES
+                    if module != '__init__']
+
+        return [entry for entry in sorted(os.listdir(self.path))
+                if entry.isidentifier() and
+                os.path.isfile(os.path.join(self.path, entry, '__init__.py'))]
+
+    def plugin_path(self, plugin):
+        """Return the location of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return os.path.join(self.path, plugin)
+
+    def load_source(self, plugin):
+        """Import the python module of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return imp.load_source(plugin, os.path.join(self.path, plugin,
+                                                    '__init__.py'))
+
+    def stat(self, plugin):
+        """Return a cheap fingerprint of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return stat_plugin(self.plugin_path(plugin))
+
+    def hash(self, plugin):
+        """Return a hash of the plugin contents.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return hash_plugin(self.plugin_path(plugin))
+
+
+class PluginCatalog(object):
+    """Merged view of several plugin sources, in order of precedence.
+
+    When a plugin is present in several sources, the first one wins;
+    precedence is resolved once per refresh() and kept in an index.
+    """
+
+    def __init__(self, sources):
+        """Initialize.
+
+        Args
+        ----
+        sources: list
+            Plugin sources, highest precedence first
+        """
+        self.sources = list(sources)
+        self.shadowed = {}
+        self._plugins = []
+        self._index = {}
+
+    def refresh(self):
+        """Refresh every source and rebuild the index."""
+        plugins = []
+        index = {}
+        shadowed = {}
+        for source in self.sources:
+            source.refresh()
+            for plugin in source.list_plugins():
+                if plugin in index:
+                    shadowed.setdefault(plugin, []).append(source)
+                    continue
+                index[plugin] = source
+                plugins.append(plugin)
+
+        self._plugins = plugins
+        self._index = index
+        self.shadowed = shadowed
+
+    def source_of(self, plugin):
+        """Return the source a plugin is served from.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        try:
+            return self._index[plugin]
+        except KeyError:
+            raise ImportError('no plugin named "{}"'.format(plugin))
+
+    def list_plugins(self):
+        """Return the names of all plugins, as of the last refresh()."""
+        return list(self._plugins)
+
+    def plugin_path(self, plugin):
+        """Return the location of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return self.source_of(plugin).plugin_path(plugin)
+
+    def load_source(self, plugin):
+        """Import the python module of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return self.source_of(plugin).load_source(plugin)
+
+    def stat(self, plugin):
+        """Return a cheap fingerprint of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        if plugin not in self._index:
+            raise IOError('no plugin named "{}"'.format(plugin))
+
+        return self._index[plugin].stat(plugin)
+
+    def hash(self, plugin):
+        """Return a hash of the plugin contents.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        if plugin not in self._index:
+            raise IOError('no plugin named "{}"'.format(plugin))
+
+        return self._index[plugin].hash(plugin)
+
+
+def open_plugin_source(path):
+    """Return the plugin source for a plugins folder or a plugin pack.
+
+    Args
+    ----
+    path: str
+        Plugins folder or plugin pack path
+    """
+    if os.path.isfile(path) and zipfile.is_zipfile(path):
+        return PluginPack(path)
+
+    return PluginDirectory(path)
+
+
+def open_plugin_catalog(paths):
+    """Return a catalog of one or several plugin folders or packs.
+
+    Args
+    ----
+    paths: str or list
+        Plugins folder or plugin pack path, or a list of them, highest
+        precedence first
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    return PluginCatalog([open_plugin_source(path) for path in paths])
+
+
+def inspect_plugin(plugin, plugin_source):
+    """Import a plugin and describe it, meant to run in a worker process.
+
+    Returns the plugin's manifest entry, or None if the plugin must be
+    discovered by the module manager itself
+    Args
+    ----
+    plugin: str
+        Plugin name (Actual python module)
+    plugin_source: PluginDirectory or PluginPack
+        Where the plugin is stored
+    """
+    the_mod = plugin_source.load_source(plugin)
+    recorder = DiscoveryRecorder()
+    try:
+        module_class = the_mod.discover_module(
+            modman=recorder, plugin_path=plugin_source.plugin_path(plugin))
+    except ManagerInteraction:
+        return None
+
+    return describe_plugin(plugin, plugin_source, module_class,
+                           cacheable=True, requires=recorder.requires)
+
+
+class DiscoveryScheduler(object):
+    """Dependency graph of plugins whose discovery was deferred.
+
+    Plugins wait on one or more module types; each one is made ready
+    exactly once, when the last of its dependencies is discovered.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        # plugin -> module types still missing
+        self._missing = {}
+        # module type -> plugins waiting on it, in deferral order
+        self._dependents = {}
+        # plugins whose dependencies are all met
+        self._ready = deque()
+
+    def defer(self, plugin, dependencies):
+        """Make a plugin wait on a set of module types.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        dependencies: list
+            Module types that must be discovered first
+        """
+        self.forget(plugin)
+        missing = set(dependencies)
+        if len(missing) == 0:
+            self._ready.append(plugin)
+            return
+
+        self._missing[plugin] = missing
+        for module_type in sorted(missing):
+            self._dependents.setdefault(module_type, []).append(plugin)
+
+    def resolve(self, module_type):
+        """Signal that a module type has been discovered.
+
+        Args
+        ----
+        module_type: str
+            Discovered module type
+        """
+        for plugin in self._dependents.pop(module_type, []):
+            missing = self._missing[plugin]
+            missing.discard(module_type)
+            if len(missing) == 0:
+                del self._missing[plugin]
+                self._ready.append(plugin)
+
+    def next_ready(self):
+        """Return the next plugin that can be discovered, or None."""
+        if len(self._ready) > 0:
+            return self._ready.popleft()
+
+        return None
+
+    def forget(self, plugin):
+        """Stop tracking a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        missing = self._missing.pop(plugin, ())
+        for module_type in missing:
+            dependents = self._dependents[module_type]
+            dependents.remove(plugin)
+            if len(dependents) == 0:
+                del self._dependents[module_type]
+
+        if plugin in self._ready:
+            self._ready.remove(plugin)
+
+    def waiting(self):
+        """Return plugins still waiting, mapped to their missing types."""
+        return dict([(plugin, sorted(missing))
+                     for plugin, missing in self._missing.items()])
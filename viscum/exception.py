@@ -41,3 +41,15 @@ class DeferModuleDiscovery(Exception):
     """Defer discovery of a module."""
 
     pass
+
+
+class PluginPackError(Exception):
+    """Plugin pack cannot be used."""
+
+    pass
+
+
+class SnapshotError(Exception):
+    """Manager snapshot cannot be used."""
+
+    pass
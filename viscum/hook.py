@@ -1,5 +1,7 @@
 """Module manager hooks."""
 
+from viscum.weak import WeakCallback, is_dead
+
 
 class ModuleManagerHookActions(object):
     """Actions executed on a hook returning true."""
@@ -21,7 +23,41 @@ class ModuleManagerHook(object):
             module or instance name
         """
         self.owner = owner
-        self.attached_callbacks = []
+        # attached callbacks in attachment order, keyed by _callback_key
+        self._callbacks = {}
+        # keys of hashable-argument callbacks, indexed by argument
+        self._by_argument = {}
+        # keys of weakly referenced callbacks, pruned once dead
+        self._weak_keys = {}
+        self._snapshot = None
+
+    @property
+    def attached_callbacks(self):
+        """Attached callbacks in attachment order.
+
+        The list is shared until the next change and must not be modified
+        """
+        if self._snapshot is None:
+            self._snapshot = list(self._callbacks.values())
+
+        return self._snapshot
+
+    @staticmethod
+    def _callback_key(callback):
+        """Return the key a callback is stored under.
+
+        Callbacks with unhashable arguments are keyed by argument identity
+        Args
+        ----
+        callback: HookAttacher
+            callback descriptor
+        """
+        try:
+            hash(callback)
+        except TypeError:
+            return (callback.callback, callback.action, id(callback.argument))
+
+        return callback
 
     def attach_callback(self, callback):
         """Attach a callback to the hook.
@@ -31,8 +67,17 @@ class ModuleManagerHook(object):
         callback: function
             callback function
         """
-        if callback not in self.attached_callbacks:
-            self.attached_callbacks.append(callback)
+        key = self._callback_key(callback)
+        if key in self._callbacks:
+            return
+
+        self._callbacks[key] = callback
+        if isinstance(callback.callback, WeakCallback):
+            self._weak_keys[key] = None
+        if key is callback:
+            self._by_argument.setdefault(callback.argument,
+                                         {})[key] = None
+        self._snapshot = None
 
     def detach_callback(self, callback):
         """Detach callback from the hook.
@@ -42,8 +87,19 @@ class ModuleManagerHook(object):
         callback: function
             callback function
         """
-        if callback in self.attached_callbacks:
-            self.attached_callbacks.remove(callback)
+        key = self._callback_key(callback)
+        if key not in self._callbacks:
+            return
+
+        del self._callbacks[key]
+        self._weak_keys.pop(key, None)
+        if key is callback:
+            same_argument = self._by_argument.get(callback.argument)
+            if same_argument is not None:
+                same_argument.pop(key, None)
+                if len(same_argument) == 0:
+                    del self._by_argument[callback.argument]
+        self._snapshot = None
 
     def find_callback_by_argument(self, argument):
         """Find an attached callbacks by the arguments specified for it.
@@ -53,9 +109,27 @@ class ModuleManagerHook(object):
         argument: object
            An argument
         """
-        attached_list = []
-        for callback in self.attached_callbacks:
-            if callback.argument == argument:
-                attached_list.append(callback)
+        try:
+            return [self._callbacks[key]
+                    for key in self._by_argument.get(argument, ())]
+        except TypeError:
+            # unhashable argument
+            return [callback for callback in self._callbacks.values()
+                    if callback.argument == argument]
+
+    def prune_dead(self):
+        """Detach weakly referenced callbacks that no longer exist.
+
+        Returns the detached callbacks
+        """
+        if len(self._weak_keys) == 0:
+            return []
+
+        pruned = []
+        for key in list(self._weak_keys):
+            callback = self._callbacks[key]
+            if is_dead(callback.callback):
+                self.detach_callback(callback)
+                pruned.append(callback)
 
-        return attached_list
+        return pruned
@@ -0,0 +1,271 @@
+"""Persistent plugin discovery manifest."""
+
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def _plugin_files(plugin_path):
+    """List the files that make up a plugin, relative to its location.
+
+    Args
+    ----
+    plugin_path: str
+        Plugin directory
+    """
+    file_list = []
+    for root, dirs, files in os.walk(plugin_path):
+        # bytecode caches are not part of the plugin
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for file_name in sorted(files):
+            if file_name.endswith(('.pyc', '.pyo')):
+                continue
+            file_list.append(os.path.relpath(os.path.join(root, file_name),
+                                             plugin_path))
+
+    return file_list
+
+
+def stat_plugin(plugin_path):
+    """Return modification time and size of every file of a plugin.
+
+    Args
+    ----
+    plugin_path: str
+        Plugin directory
+    """
+    file_stats = {}
+    for file_name in _plugin_files(plugin_path):
+        st = os.stat(os.path.join(plugin_path, file_name))
+        file_stats[file_name] = [st.st_mtime, st.st_size]
+
+    return file_stats
+
+
+def hash_plugin(plugin_path):
+    """Return a hash of the names and contents of all plugin files.
+
+    Args
+    ----
+    plugin_path: str
+        Plugin directory
+    """
+    digest = hashlib.sha1()
+    for file_name in _plugin_files(plugin_path):
+        digest.update(file_name.encode('utf-8'))
+        with open(os.path.join(plugin_path, file_name), 'rb') as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def fingerprint_plugin(plugin, plugin_source):
+    """Build the fingerprint of a plugin.
+
+    Args
+    ----
+    plugin: str
+        Plugin name (Actual python module)
+    plugin_source: PluginDirectory or PluginPack
+        Where the plugin is stored
+    """
+    return {'files': plugin_source.stat(plugin),
+            'hash': plugin_source.hash(plugin)}
+
+
+def describe_plugin(plugin, plugin_source, module_class,
+                    cacheable=True, requires=(), fingerprint=None):
+    """Build the manifest entry of a discovered plugin.
+
+    Args
+    ----
+    plugin: str
+        Plugin name (Actual python module)
+    plugin_source: PluginDirectory or PluginPack
+        Where the plugin is stored
+    module_class: class
+        Discovered plugin class
+    cacheable: bool
+        Whether the plugin may be served without importing it
+    requires: list
+        Module types required at discovery time
+    fingerprint: dict
+        Fingerprint known to match the plugin files, computed if None
+    """
+    if fingerprint is None:
+        fingerprint = fingerprint_plugin(plugin, plugin_source)
+    desc = module_class.get_module_desc()
+    entry = {'plugin': plugin,
+             'fingerprint': fingerprint,
+             'module_desc': [desc.arg_name, desc.arg_help],
+             'capabilities': list(module_class.get_capabilities()),
+             'required_kw': [list(kw) for kw
+                             in module_class.get_required_kwargs()],
+             'optional_kw': [list(kw) for kw
+                             in module_class.get_optional_kwargs()],
+             'strict_kw': module_class.get_kwargs_validator().strict,
+             'multi_inst_suffix': module_class.get_multi_inst_suffix(),
+             'structure': module_class.dump_module_structure(),
+             'requires': list(requires),
+             'cacheable': cacheable}
+
+    # everything must survive the round trip through the file
+    try:
+        json.dumps(entry)
+    except (TypeError, ValueError):
+        entry['structure'] = None
+        entry['required_kw'] = [kw[:2] for kw in entry['required_kw']]
+        entry['optional_kw'] = [kw[:2] for kw in entry['optional_kw']]
+        entry['cacheable'] = False
+
+    return entry
+
+
+def entry_is_current(entry, plugin_source):
+    """Check that a plugin entry matches the plugin files.
+
+    File modification times and sizes are compared first; the content
+    hash is only computed when those differ.
+    Args
+    ----
+    entry: dict
+        Plugin entry, built by describe_plugin
+    plugin_source: PluginDirectory or PluginPack
+        Where the plugin is stored
+    """
+    plugin = entry['plugin']
+    try:
+        file_stats = plugin_source.stat(plugin)
+        if file_stats == entry['fingerprint']['files']:
+            return True
+
+        if plugin_source.hash(plugin) != entry['fingerprint']['hash']:
+            return False
+    except (IOError, OSError):
+        return False
+
+    # same contents, only metadata changed
+    entry['fingerprint']['files'] = file_stats
+    return True
+
+
+class DiscoveryManifest(object):
+    """On-disk record of discovered plugins, keyed by plugin name."""
+
+    def __init__(self, filename):
+        """Initialize.
+
+        Args
+        ----
+        filename: str
+            Manifest file path
+        """
+        self.filename = filename
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """Read the manifest file; missing or unusable files are ignored."""
+        self.entries = {}
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+
+        if not isinstance(data, dict) or\
+           data.get('version') != MANIFEST_VERSION:
+            return
+
+        self.entries = data.get('plugins', {})
+
+    def save(self):
+        """Write the manifest file."""
+        tmp_name = '{}.tmp'.format(self.filename)
+        with open(tmp_name, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION,
+                       'plugins': self.entries}, f)
+        os.replace(tmp_name, self.filename)
+
+    def lookup(self, plugin, plugin_source):
+        """Return the entry of a plugin if its files did not change.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        plugin_source: PluginDirectory or PluginPack
+            Where the plugin is stored
+        """
+        entry = self.entries.get(plugin)
+        if entry is None or not entry_is_current(entry, plugin_source):
+            return None
+
+        return entry
+
+    def record(self, plugin, plugin_source, module_class,
+               cacheable=True, requires=()):
+        """Record a successfully discovered plugin.
+
+        The stored fingerprint is kept if the file modification times and
+        sizes did not change, so plugin files are only hashed when they do
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        plugin_source: PluginDirectory or PluginPack
+            Where the plugin is stored
+        module_class: class
+            Discovered plugin class
+        cacheable: bool
+            Whether the plugin may be served without importing it
+        requires: list
+            Module types required at discovery time
+        """
+        fingerprint = None
+        entry = self.entries.get(plugin)
+        if entry is not None:
+            try:
+                if plugin_source.stat(plugin) ==\
+                   entry['fingerprint']['files']:
+                    fingerprint = entry['fingerprint']
+            except (IOError, OSError):
+                pass
+
+        self.insert(describe_plugin(plugin, plugin_source, module_class,
+                                    cacheable, requires, fingerprint))
+
+    def insert(self, entry):
+        """Record a plugin entry built by describe_plugin.
+
+        Args
+        ----
+        entry: dict
+            Plugin entry
+        """
+        self.entries[entry['plugin']] = entry
+
+    def remove(self, plugin):
+        """Forget about a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        self.entries.pop(plugin, None)
+
+    def prune(self, plugin_list):
+        """Remove entries of plugins that are not in a list.
+
+        Args
+        ----
+        plugin_list: list
+            Plugin names that are still present
+        """
+        for plugin in list(self.entries.keys()):
+            if plugin not in plugin_list:
+                del self.entries[plugin]
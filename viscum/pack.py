@@ -0,0 +1,259 @@
+"""Single-file plugin packs, imported through zipimport."""
+
+from viscum.exception import PluginPackError
+from viscum.manifest import hash_plugin, _plugin_files
+import importlib.util
+import json
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+import zipimport
+
+PACK_MANIFEST = 'viscum-pack.json'
+PACK_VERSION = 1
+
+# open packs, indexed by archive path
+_PACKS = {}
+
+
+def find_pack(path):
+    """Return the open pack a path points into, if any.
+
+    Args
+    ----
+    path: str
+        Path of a plugin or of a file inside a plugin
+    """
+    for pack_file, pack in _PACKS.items():
+        if path.startswith(pack_file + os.sep):
+            return pack
+
+    return None
+
+
+def read_plugin_file(filename):
+    """Read a plugin data file, either from a pack or from disk.
+
+    Args
+    ----
+    filename: str
+        File path
+    """
+    pack = find_pack(filename)
+    if pack is not None:
+        return pack.read(filename).decode('utf-8')
+
+    with open(filename, 'r') as f:
+        return f.read()
+
+
+class PluginPack(object):
+    """Plugin source backed by a pack built with build_plugin_pack."""
+
+    def __init__(self, path):
+        """Initialize.
+
+        Args
+        ----
+        path: str
+            Pack file path
+        """
+        self.path = os.path.abspath(path)
+        self._archive = None
+        self._importer = None
+        self.refresh()
+
+    def __getstate__(self):
+        """Only the location is passed to worker processes."""
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        """Reopen in worker processes.
+
+        Args
+        ----
+        state: dict
+            Pickled state
+        """
+        self.__init__(state['path'])
+
+    def refresh(self):
+        """(Re)open the archive and read its manifest."""
+        if self._archive is not None:
+            self._archive.close()
+
+        try:
+            self._archive = zipfile.ZipFile(self.path, 'r')
+            manifest = json.loads(
+                self._archive.read(PACK_MANIFEST).decode('utf-8'))
+        except (IOError, OSError, KeyError, ValueError,
+                zipfile.BadZipfile) as ex:
+            raise PluginPackError('invalid plugin pack "{}": {}'
+                                  .format(self.path, ex))
+
+        if manifest.get('version') != PACK_VERSION:
+            raise PluginPackError('unsupported plugin pack version')
+        if manifest['cache_tag'] != sys.implementation.cache_tag:
+            raise PluginPackError('plugin pack was built for {}, this is {}'
+                                  .format(manifest['cache_tag'],
+                                          sys.implementation.cache_tag))
+
+        self._plugins = [plugin['name'] for plugin in manifest['plugins']]
+        self._hashes = dict([(plugin['name'], plugin['hash'])
+                             for plugin in manifest['plugins']])
+
+        if self._importer is not None:
+            self._importer.invalidate_caches()
+        self._importer = zipimport.zipimporter(self.path)
+        _PACKS[self.path] = self
+
+    def list_plugins(self):
+        """Return the names of the plugins in the pack."""
+        return list(self._plugins)
+
+    def plugin_path(self, plugin):
+        """Return the location of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return os.path.join(self.path, plugin)
+
+    def load_source(self, plugin):
+        """Import the python module of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        if plugin not in self._hashes:
+            raise ImportError('plugin "{}" is not in pack'.format(plugin))
+
+        return self._exec_module(self._importer, plugin)
+
+    def load_component(self, plugin_path, module_name):
+        """Import a plugin sub-module.
+
+        Args
+        ----
+        plugin_path: str
+            Location of plugin inside the pack
+        module_name: str
+            Sub-module name
+        """
+        return self._exec_module(zipimport.zipimporter(plugin_path),
+                                 module_name)
+
+    @staticmethod
+    def _exec_module(importer, name):
+        """Import a module through a zipimporter, always executing it.
+
+        Args
+        ----
+        importer: zipimport.zipimporter
+            Importer for the location of the module
+        name: str
+            Module name
+        """
+        spec = importer.find_spec(name)
+        if spec is None:
+            raise ImportError('no module named "{}" in {}'
+                              .format(name, importer.archive))
+
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[name]
+            raise
+
+        return module
+
+    def read(self, filename):
+        """Read a file from the pack.
+
+        Args
+        ----
+        filename: str
+            File path, inside the pack
+        """
+        member = os.path.relpath(filename, self.path).replace(os.sep, '/')
+        try:
+            return self._archive.read(member)
+        except KeyError:
+            raise IOError('no such file in plugin pack: "{}"'
+                          .format(filename))
+
+    def stat(self, plugin):
+        """Return a cheap fingerprint of a plugin.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return self._hashes.get(plugin)
+
+    def hash(self, plugin):
+        """Return a hash of the plugin contents.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        return self._hashes.get(plugin)
+
+
+def build_plugin_pack(plugin_source, pack_file,
+                      compression=zipfile.ZIP_DEFLATED):
+    """Pack the plugins of a plugin folder into a single file.
+
+    Python files are stored as bytecode only, for the running
+    interpreter version; other files are stored as they are.
+    Args
+    ----
+    plugin_source: PluginDirectory
+        Plugins to pack
+    pack_file: str
+        Pack file path
+    compression: int
+        zipfile compression method
+    """
+    manifest = {'version': PACK_VERSION,
+                'cache_tag': sys.implementation.cache_tag,
+                'plugins': []}
+
+    handle, pyc_file = tempfile.mkstemp(suffix='.pyc')
+    os.close(handle)
+    try:
+        with zipfile.ZipFile(pack_file, 'w', compression) as archive:
+            for plugin in plugin_source.list_plugins():
+                plugin_path = plugin_source.plugin_path(plugin)
+                for file_name in _plugin_files(plugin_path):
+                    source = os.path.join(plugin_path, file_name)
+                    member = '/'.join([plugin] + file_name.split(os.sep))
+                    if not file_name.endswith('.py'):
+                        archive.write(source, member)
+                        continue
+
+                    py_compile.compile(
+                        source, cfile=pyc_file,
+                        dfile=os.path.join(pack_file, plugin, file_name),
+                        doraise=True,
+                        invalidation_mode=py_compile.PycInvalidationMode
+                        .UNCHECKED_HASH)
+                    archive.write(pyc_file, member + 'c')
+
+                manifest['plugins'].append({'name': plugin,
+                                            'hash': hash_plugin(plugin_path)})
+
+            archive.writestr(PACK_MANIFEST, json.dumps(manifest))
+    finally:
+        os.remove(pyc_file)
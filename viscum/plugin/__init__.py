@@ -7,13 +7,18 @@ from viscum.plugin.exception import (ModuleLoadError,
                                      ModulePropertyPermissionError,
                                      ModuleMethodError)
 from viscum.plugin.prop import (ModulePropertyPermissions,
-                                ModuleProperty)
-from viscum.plugin.method import ModuleMethod, ModuleMethodArgument
+                                ModuleProperty, BoundProperty)
+from viscum.plugin.method import (ModuleMethod, ModuleMethodArgument,
+                                  BoundMethod)
+from viscum.plugin.args import ArgumentValidator
+from viscum.profiling import profiled
+from viscum.pack import read_plugin_file
 import json
-import copy
 
-# simple description for arguments
-ModuleArgument = namedtuple('ModuleArgument', ['arg_name', 'arg_help'])
+# simple description for arguments, data type and default are optional
+ModuleArgument = namedtuple('ModuleArgument', ['arg_name', 'arg_help',
+                                               'data_type', 'default'],
+                            defaults=(None, None))
 
 
 def read_json_from_file(filename):
@@ -26,8 +31,8 @@ def read_json_from_file(filename):
     returns: dictionary
     """
     data = {}
-    with open(filename, 'r') as f:
-        data = json.load(f)
+    with profiled('descriptor', filename):
+        data = json.loads(read_plugin_file(filename))
 
     return data
 
@@ -60,6 +65,7 @@ class Module(object):
     # before loading the module (i.e. creating the actual object)
     _required_kw = []  # list of mandatory kwargs for module loading
     _optional_kw = []  # list of optional kwargs for module loading
+    _strict_kw = False  # reject kwargs that are not declared
     _module_desc = ModuleArgument(None, None)  # module identifier
     _capabilities = []  # a list of the module's capabilities
     _properties = {}  # the module's properties, indexed by property name
@@ -84,15 +90,21 @@ class Module(object):
         kwargs: dict
             Invoking arguments
         """
+        # state prepared ahead of time by a standby pool, if any
+        self._standby = kwargs.pop('standby', None)
+
         # check the kwargs passed to constructor
         self._check_kwargs(**kwargs)
 
         # save passed kwargs
         self._loaded_kwargs = dict(kwargs)
+        self.get_kwargs_validator().apply_defaults(self._loaded_kwargs)
 
-        # create copies of static members
-        self._methods = copy.deepcopy(self._methods)
-        self._properties = copy.deepcopy(self._properties)
+        # bind the shared class-level descriptors to this instance
+        self._methods = dict([(name, BoundMethod(method))
+                              for name, method in self._methods.items()])
+        self._properties = dict([(name, BoundProperty(prop))
+                                 for name, prop in self._properties.items()])
 
         # register module
         self.module_register(module_id, handler)
@@ -117,20 +129,36 @@ class Module(object):
         """Return a list of optional arguments."""
         return cls._optional_kw
 
+    @classmethod
+    def get_kwargs_validator(cls):
+        """Return the compiled load argument checks of the class."""
+        if '_kw_validator' not in cls.__dict__:
+            cls._kw_validator = ArgumentValidator(cls._required_kw,
+                                                  cls._optional_kw,
+                                                  cls._strict_kw)
+        return cls._kw_validator
+
     @classmethod
     def _check_kwargs(cls, **kwargs):
-        """Verify if required kwargs are met, raise exception if not.
+        """Verify if kwargs are valid, raise exception if not.
 
         Args
         ----
         kwargs: dict
             List of keyword arguments to check
         """
-        for kwg in cls._required_kw:
-            if kwg.arg_name not in kwargs:
-                raise ModuleLoadError('missing argument: {}'
-                                      .format(kwg.arg_name),
-                                      cls._module_desc.arg_name)
+        error = cls.get_kwargs_validator().check(kwargs)
+        if error is not None:
+            raise ModuleLoadError(error[1], cls._module_desc.arg_name)
+
+    @classmethod
+    def module_standby(cls):
+        """Do the device-independent part of the setup ahead of a load.
+
+        Called by standby pools; the returned object is available to the
+        constructor as self._standby (module-specific, to be overriden)
+        """
+        return None
 
     def module_unload(self):
         """Unload module procedure (module-specific, to be overriden)."""
@@ -0,0 +1,96 @@
+"""Compiled validation of plugin load arguments."""
+
+from viscum.plugin.dtype import ModuleDataTypes
+import copy
+
+# arguments handled by the module manager, accepted by every plugin
+MANAGER_KWARGS = frozenset(['instance_name', 'instance_suffix', 'plugmgr',
+                            'loaded_by', 'standby'])
+
+
+def _is_list_of(value, types):
+    return isinstance(value, (list, tuple)) and\
+        all([isinstance(item, types) and not isinstance(item, bool)
+             for item in value])
+
+
+_TYPE_CHECKS = {
+    ModuleDataTypes.INT:
+    lambda value: isinstance(value, int) and not isinstance(value, bool),
+    ModuleDataTypes.FLOAT:
+    lambda value: isinstance(value, (int, float)) and
+    not isinstance(value, bool),
+    ModuleDataTypes.STRING: lambda value: isinstance(value, str),
+    ModuleDataTypes.BOOLEAN: lambda value: isinstance(value, bool),
+    ModuleDataTypes.DICT: lambda value: isinstance(value, dict),
+    ModuleDataTypes.INT_LIST: lambda value: _is_list_of(value, int),
+    ModuleDataTypes.FLOAT_LIST:
+    lambda value: _is_list_of(value, (int, float)),
+    ModuleDataTypes.STRING_LIST: lambda value: _is_list_of(value, str),
+    ModuleDataTypes.VOID_LIST:
+    lambda value: isinstance(value, (list, tuple)),
+}
+
+
+class ArgumentValidator(object):
+    """Load argument checks of a plugin class, compiled once."""
+
+    def __init__(self, required_kw, optional_kw, strict=False):
+        """Initialize.
+
+        Args
+        ----
+        required_kw: list
+            ModuleArgument list of mandatory arguments
+        optional_kw: list
+            ModuleArgument list of optional arguments
+        strict: bool
+            Reject arguments that are not declared
+        """
+        self._required = [(kw.arg_name, _TYPE_CHECKS.get(kw.data_type))
+                          for kw in required_kw]
+        self._checks = dict([(kw.arg_name, _TYPE_CHECKS.get(kw.data_type))
+                             for kw in required_kw + optional_kw])
+        self._defaults = [(kw.arg_name, kw.default) for kw in optional_kw
+                          if kw.default is not None]
+        self.strict = strict
+
+    def check(self, kwargs):
+        """Check load arguments.
+
+        Returns None, or an (error, message) pair
+        Args
+        ----
+        kwargs: dict
+            Arguments passed to plugin
+        """
+        for arg_name, _ in self._required:
+            if arg_name not in kwargs:
+                return ('missing_argument',
+                        'missing argument: {}'.format(arg_name))
+
+        for arg_name, value in kwargs.items():
+            if arg_name not in self._checks:
+                if self.strict and arg_name not in MANAGER_KWARGS:
+                    return ('invalid_argument',
+                            'unknown argument: {}'.format(arg_name))
+                continue
+
+            type_check = self._checks[arg_name]
+            if type_check is not None and not type_check(value):
+                return ('invalid_argument',
+                        'invalid type for argument: {}'.format(arg_name))
+
+        return None
+
+    def apply_defaults(self, kwargs):
+        """Add the default value of missing optional arguments.
+
+        Args
+        ----
+        kwargs: dict
+            Arguments passed to plugin, modified in place
+        """
+        for arg_name, default in self._defaults:
+            if arg_name not in kwargs:
+                kwargs[arg_name] = copy.copy(default)
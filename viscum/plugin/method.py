@@ -72,3 +72,50 @@ class ModuleMethodArgument(object):
         self.argument_required = argument_required
         self.data_type = data_type
         self.__dict__.update(kwargs)
+
+
+class BoundMethod(object):
+    """Per-instance binding of a shared method descriptor.
+
+    Only the method call belongs to the instance; arguments are copied
+    from the class-level descriptor when added to, other attributes are
+    read from it unless set on the binding
+    """
+
+    # __dict__ keeps attributes set on the binding working as before
+    __slots__ = ('descriptor', 'method_call', 'method_args', '__dict__')
+
+    def __init__(self, descriptor):
+        """Initialize.
+
+        Args
+        ----
+        descriptor: ModuleMethod
+            Class-level descriptor, never modified
+        """
+        self.descriptor = descriptor
+        self.method_call = descriptor.method_call
+
+    def __getattr__(self, name):
+        """Read other attributes from the descriptor.
+
+        Args
+        ----
+        name: str
+            Attribute name
+        """
+        if name == 'descriptor':
+            raise AttributeError(name)
+        return getattr(self.descriptor, name)
+
+    def add_arguments(self, arguments):
+        """Add more arguments to the method description of this instance.
+
+        Args
+        ----
+        arguments: dict
+            Name-indexed argument dictionary
+        """
+        method_args = dict(self.method_args)
+        method_args.update(arguments)
+        self.method_args = method_args
@@ -46,3 +46,38 @@ class ModuleProperty(object):
 
         # hacky hack
         self.__dict__.update(kwargs)
+
+
+class BoundProperty(object):
+    """Per-instance binding of a shared property descriptor.
+
+    Only the getter and setter belong to the instance, everything else is
+    read from the class-level descriptor unless set on the binding
+    """
+
+    # __dict__ keeps attributes set on the binding working as before
+    __slots__ = ('descriptor', 'getter', 'setter', '__dict__')
+
+    def __init__(self, descriptor):
+        """Initialize.
+
+        Args
+        ----
+        descriptor: ModuleProperty
+            Class-level descriptor, never modified
+        """
+        self.descriptor = descriptor
+        self.getter = descriptor.getter
+        self.setter = descriptor.setter
+
+    def __getattr__(self, name):
+        """Read other attributes from the descriptor.
+
+        Args
+        ----
+        name: str
+            Attribute name
+        """
+        if name == 'descriptor':
+            raise AttributeError(name)
+        return getattr(self.descriptor, name)
@@ -0,0 +1,84 @@
+"""Stand-in for plugin classes that have not been imported."""
+
+from viscum.plugin import ModuleArgument
+from viscum.plugin.args import ArgumentValidator
+
+
+class ModuleStub(object):
+    """Discovered plugin whose class has not been imported yet.
+
+    Answers the same class-level queries as Module, from previously
+    recorded plugin metadata.
+    """
+
+    def __init__(self, entry):
+        """Initialize.
+
+        Args
+        ----
+        entry: dict
+            Recorded plugin metadata (see DiscoveryManifest)
+        """
+        self.entry = entry
+        self.plugin = entry['plugin']
+        self.requires = list(entry.get('requires', []))
+        self._module_desc = ModuleArgument(*entry['module_desc'])
+        self._capabilities = list(entry['capabilities'])
+        self._required_kw = [ModuleArgument(*kw)
+                             for kw in entry['required_kw']]
+        self._optional_kw = [ModuleArgument(*kw)
+                             for kw in entry['optional_kw']]
+        self._kw_validator = ArgumentValidator(self._required_kw,
+                                               self._optional_kw,
+                                               entry.get('strict_kw', False))
+        self._multi_inst_suffix = entry['multi_inst_suffix']
+        self._structure = entry['structure']
+        self.__name__ = '{}Stub'.format(self._module_desc.arg_name)
+
+    def __repr__(self):
+        """Get representation."""
+        return '<ModuleStub of "{}">'.format(self._module_desc.arg_name)
+
+    def get_capabilities(self):
+        """Return module's capabilities."""
+        return self._capabilities
+
+    def get_module_desc(self):
+        """Return module's description."""
+        return self._module_desc
+
+    def get_required_kwargs(self):
+        """Return a list of required arguments to spawn module."""
+        return self._required_kw
+
+    def get_optional_kwargs(self):
+        """Return a list of optional arguments."""
+        return self._optional_kw
+
+    def get_kwargs_validator(self):
+        """Return the compiled load argument checks of the plugin."""
+        return self._kw_validator
+
+    def get_module_type(self):
+        """Return module type (identifier from description)."""
+        return self._module_desc.arg_name
+
+    def get_module_info(self):
+        """Return a dictionary contaning basic module description."""
+        return dict(self._structure['module_desc'])
+
+    def get_module_properties(self):
+        """Return a list of the module's properties as a dictionary."""
+        return self._structure['module_properties']
+
+    def get_module_methods(self):
+        """Return all the module's methods as a dictionary."""
+        return self._structure['module_methods']
+
+    def dump_module_structure(self):
+        """Dump the module's description as a JSON-serializable dictionary."""
+        return self._structure
+
+    def get_multi_inst_suffix(self):
+        """Return the module-specific multi instance suffix."""
+        return self._multi_inst_suffix
@@ -1,5 +1,6 @@
 """Miscellaneous plugin utilities."""
 
+from viscum.pack import find_pack
 import imp
 import os.path
 
@@ -14,6 +15,11 @@ def load_plugin_component(plugin_path, module_name):
     module_name: str
        Module (plugin) name
     """
+    pack = find_pack(plugin_path)
+    if pack is not None:
+        pack.load_component(plugin_path, module_name)
+        return
+
     try:
         imp.load_source(module_name, os.path.join(plugin_path,
                                                   '{}.py'
@@ -0,0 +1,234 @@
+"""Startup profiling."""
+
+import json
+import threading
+import time
+
+_active = threading.local()
+
+
+class _NullSpan(object):
+    """Span that records nothing."""
+
+    def __enter__(self):
+        """Enter."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit."""
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+    """A timed span, recorded by a StartupProfiler on exit."""
+
+    def __init__(self, profiler, phase, name):
+        """Initialize.
+
+        Args
+        ----
+        profiler: StartupProfiler
+            Owner of the span
+        phase: str
+            What is being timed
+        name: str
+            Plugin, script or instance the span refers to
+        """
+        self._profiler = profiler
+        self._phase = phase
+        self._name = name
+        self._parent = None
+        self._start = None
+
+    def __enter__(self):
+        """Start timing."""
+        stack = _span_stack()
+        if len(stack) > 0:
+            self._parent = stack[-1]
+        stack.append(self)
+        self._start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        """Stop timing and record."""
+        end = time.time()
+        _span_stack().pop()
+        self._profiler._record(self, end)
+        return False
+
+
+def _span_stack():
+    """Return the spans open in the current thread."""
+    if not hasattr(_active, 'stack'):
+        _active.stack = []
+
+    return _active.stack
+
+
+def profiled(phase, name):
+    """Time a nested phase against the profiler of the enclosing span.
+
+    Does nothing if no span is open in the current thread
+    Args
+    ----
+    phase: str
+        What is being timed
+    name: str
+        Plugin, script or file the span refers to
+    """
+    stack = _span_stack()
+    if len(stack) == 0:
+        return _NULL_SPAN
+
+    return stack[-1]._profiler.span(phase, name)
+
+
+class StartupProfiler(object):
+    """Records timed spans of discovery, script and module loading phases."""
+
+    def __init__(self, enabled=True):
+        """Initialize.
+
+        Args
+        ----
+        enabled: bool
+            Whether spans are recorded
+        """
+        self.enabled = enabled
+        self.spans = []
+        self.deferrals = []
+        self._lock = threading.Lock()
+
+    def span(self, phase, name):
+        """Return a context manager that times a phase.
+
+        Args
+        ----
+        phase: str
+            What is being timed (import, discover, descriptor, script,
+            script_sanitize, construct...)
+        name: str
+            Plugin, script or instance the span refers to
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+
+        return _Span(self, phase, name)
+
+    def _record(self, span, end):
+        """Store a finished span.
+
+        Args
+        ----
+        span: _Span
+            The span
+        end: float
+            End timestamp
+        """
+        if span._parent is not None:
+            parent = (span._parent._phase, span._parent._name)
+        else:
+            parent = None
+        with self._lock:
+            self.spans.append({'phase': span._phase,
+                               'name': span._name,
+                               'start': span._start,
+                               'duration': end - span._start,
+                               'parent': parent})
+
+    def note_deferral(self, plugin, dependencies):
+        """Record that the discovery of a plugin was deferred.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        dependencies: list
+            Module types it waits on
+        """
+        if self.enabled:
+            self.deferrals.append({'plugin': plugin,
+                                   'waits_on': list(dependencies),
+                                   'deferred_at': time.time(),
+                                   'resumed_at': None})
+
+    def note_resumed(self, plugin):
+        """Record that a deferred plugin is being discovered again.
+
+        Args
+        ----
+        plugin: str
+            Plugin name (Actual python module)
+        """
+        for deferral in reversed(self.deferrals):
+            if deferral['plugin'] == plugin:
+                deferral['resumed_at'] = time.time()
+                return
+
+    def report(self, slowest=10):
+        """Build a JSON-serializable report of the recorded spans.
+
+        Args
+        ----
+        slowest: int
+            Number of slowest items to list
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        if len(spans) > 0:
+            origin = min(span['start'] for span in spans)
+            wall_time = max(span['start'] + span['duration']
+                            for span in spans) - origin
+        else:
+            origin = 0
+            wall_time = 0
+
+        phase_totals = {}
+        for span in spans:
+            phase_totals[span['phase']] =\
+                phase_totals.get(span['phase'], 0) + span['duration']
+
+        def relative(span):
+            span = dict(span)
+            span['start'] -= origin
+            return span
+
+        slowest_spans = sorted(spans, key=lambda span: span['duration'],
+                               reverse=True)[:slowest]
+
+        deferrals = []
+        for deferral in self.deferrals:
+            deferral = dict(deferral)
+            deferral['deferred_at'] -= origin
+            if deferral['resumed_at'] is not None:
+                deferral['resumed_at'] -= origin
+            deferrals.append(deferral)
+
+        return {'wall_time': wall_time,
+                'phase_totals': phase_totals,
+                'slowest': [relative(span) for span in slowest_spans],
+                'deferrals': deferrals,
+                'spans': [relative(span) for span in spans]}
+
+    def dump(self, filename, slowest=10):
+        """Write the report to a JSON file.
+
+        Args
+        ----
+        filename: str
+            File path
+        slowest: int
+            Number of slowest items to list
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.report(slowest), f, indent=2)
+
+    def clear(self):
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.spans = []
+        self.deferrals = []
@@ -5,6 +5,7 @@ import symtable
 import astor
 from viscum.plugin import ModuleCapabilities as ModCap
 from viscum.hook import ModuleManagerHookActions
+from viscum.profiling import profiled
 from viscum.scripting.exception import (InvalidModuleError,
                                         DeferScriptLoading,
                                         ScriptSyntaxError,
@@ -33,9 +34,10 @@ class ModuleManagerScript(object):
         with open(source_file, 'r') as f:
             try:
                 text = f.read()
-                self.sanitized_code =\
-                    ModuleManagerScript.sanitize_code(text,
-                                                      self._sanitizer_logging)
+                with profiled('script_sanitize', source_file):
+                    self.sanitized_code =\
+                        ModuleManagerScript.sanitize_code(
+                            text, self._sanitizer_logging)
             except Exception:
                 raise
 
@@ -85,6 +87,9 @@ class ModuleManagerScript(object):
         global_scope: dict
             Scope in which the code is executed
         """
+        # instances that are not loaded yet, all reported at once
+        missing_instances = []
+
         def parse_symtab(symtab):
             required_modules = set()
             # go through symbols and detect those that have not been assigned
@@ -114,11 +119,13 @@ class ModuleManagerScript(object):
                             module_type)
                         if ModCap.MultiInstanceAllowed in mod_caps and\
                            instance_name != '':
-                            raise DeferScriptLoading({'type': module_type,
-                                                      'inst': instance_name})
+                            missing_instances.append({'type': module_type,
+                                                      'inst': instance_name,
+                                                      'name': symbol_name})
                         elif ModCap.MultiInstanceAllowed not in mod_caps:
-                            raise DeferScriptLoading({'type': module_type,
-                                                      'inst': module_type})
+                            missing_instances.append({'type': module_type,
+                                                      'inst': module_type,
+                                                      'name': module_type})
                         else:
                             required_modules.add(module_type)
                     elif symbol_name in global_scope:
@@ -144,6 +151,12 @@ class ModuleManagerScript(object):
         for tab in symtab.get_children():
             required_modules |= (parse_symtab(tab))
 
+        if len(missing_instances) > 0:
+            requirement = dict(missing_instances[0])
+            requirement['names'] = sorted(set(missing['name'] for missing
+                                              in missing_instances))
+            raise DeferScriptLoading(requirement)
+
         return required_modules
 
     def _instrument_code(self, sanitized_code):
@@ -214,7 +227,8 @@ class ModuleManagerScript(object):
 
         # check if is loaded, else defer
         if _inst_name not in self._modman.get_loaded_module_list():
-            raise DeferScriptLoading({'type': module_type, 'inst': _inst_name})
+            raise DeferScriptLoading({'type': module_type, 'inst': _inst_name,
+                                      'name': _inst_name})
 
     def _attach_man_hook(self, hook_name, cb):
         """Attach to manager system hooks.
@@ -282,6 +296,16 @@ class ModuleManagerScript(object):
         """
         self._modman.load_module(module_name, **kwargs)
 
+    def _load_modules(self, requests):
+        """Load several plugins at once.
+
+        Args
+        ----
+        requests: list
+            Plugin names, or (plugin name, arguments dict) pairs
+        """
+        return self._modman.load_modules(requests)
+
     def initialize_script(self):
         """Initialize the compiled code."""
         if self._executed_once:
@@ -295,7 +319,8 @@ class ModuleManagerScript(object):
                              'attach_man_hook': self._attach_man_hook,
                              'set_name': self._set_name,
                              'cancel_exec': self._cancel_exec,
-                             'load_module': self._load_module}
+                             'load_module': self._load_module,
+                             'load_modules': self._load_modules}
 
         # print self.sanitized_code.body
         # parse code a bit more and detect module usage
@@ -450,7 +475,7 @@ class ModuleProxy(object):
     def get_available_instances(self):
         """Return available instances."""
         module_type, _ = self._get_instance_id()
-        return self._modman.get_instance_list_by_type(self._modname)
+        return self._modman.get_instance_list_by_type(module_type)
 
     def get_instance(self, instance_name):
         """Return a proxy for an instance.
@@ -463,17 +488,18 @@ class ModuleProxy(object):
         module_type, _ = self._get_instance_id()
         mod_cap = self._modman.get_module_capabilities(module_type)
 
-        if mod_cap is not None:
-            if ModCap.MultiInstanceAllowed in mod_cap:
-                _instance_name = '{}-{}'.format(module_type, instance_name)
-            else:
-                _instance_name = instance_name
-            if _instance_name in self.get_available_instances():
-                return ModuleProxy(self._modname, self._modman, instance_name)
+        if mod_cap is not None and ModCap.MultiInstanceAllowed not in mod_cap:
+            _instance_name = instance_name
+        else:
+            _instance_name = '{}-{}'.format(module_type, instance_name)
+        if mod_cap is not None and\
+           _instance_name in self.get_available_instances():
+            return ModuleProxy(self._modname, self._modman, instance_name)
 
         # if we reach here, then the module or instance is not loaded.
         raise DeferScriptLoading({'type': self._modname,
-                                  'inst': instance_name})
+                                  'inst': instance_name,
+                                  'name': _instance_name})
 
     def _get_instance_id(self):
         """Retrieve instance name."""
@@ -0,0 +1,98 @@
+"""Warm-restart snapshots of module manager state."""
+
+from viscum.exception import SnapshotError
+import json
+import os
+
+SNAPSHOT_VERSION = 1
+
+
+def storable_kwargs(kwargs):
+    """Split instance arguments into storable ones and live objects.
+
+    Returns the storable arguments and the names of the dropped ones
+    Args
+    ----
+    kwargs: dict
+        Arguments an instance was loaded with
+    """
+    stored = {}
+    dropped = []
+    for arg_name, value in kwargs.items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            dropped.append(arg_name)
+            continue
+        stored[arg_name] = value
+
+    return stored, dropped
+
+
+def dependency_order(instances):
+    """Order instances so that every one comes after its loader.
+
+    Original order is kept otherwise
+    Args
+    ----
+    instances: list
+        Instance records, as stored in a snapshot
+    """
+    by_name = dict([(instance['name'], instance) for instance in instances])
+    ordered = []
+    placed = set()
+
+    def place(instance, visiting):
+        if instance['name'] in placed or instance['name'] in visiting:
+            return
+        visiting.add(instance['name'])
+        parent = by_name.get(instance['loaded_by'])
+        if parent is not None:
+            place(parent, visiting)
+        placed.add(instance['name'])
+        ordered.append(instance)
+
+    for instance in instances:
+        place(instance, set())
+
+    return ordered
+
+
+def write_snapshot(filename, data):
+    """Write a snapshot file.
+
+    Args
+    ----
+    filename: str
+        File path
+    data: dict
+        Snapshot contents
+    """
+    data = dict(data)
+    data['version'] = SNAPSHOT_VERSION
+    tmp_name = '{}.tmp'.format(filename)
+    with open(tmp_name, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_name, filename)
+
+
+def read_snapshot(filename):
+    """Read a snapshot file.
+
+    Args
+    ----
+    filename: str
+        File path
+    """
+    try:
+        with open(filename, 'r') as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError) as ex:
+        raise SnapshotError('could not read snapshot "{}": {}'
+                            .format(filename, ex))
+
+    if not isinstance(data, dict) or\
+       data.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError('unsupported snapshot version')
+
+    return data
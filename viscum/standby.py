@@ -0,0 +1,68 @@
+"""Standby pools of pre-initialized plugin state."""
+
+from collections import deque
+import threading
+
+
+class StandbyPool(object):
+    """Pool of standby objects prepared ahead of loads of a plugin type.
+
+    Standby objects are built by the module_standby class method of the
+    plugin and handed, one per load, to the constructor
+    """
+
+    def __init__(self, module_class, size):
+        """Initialize.
+
+        Args
+        ----
+        module_class: class
+            Plugin class
+        size: int
+            Number of standby objects to keep ready
+        """
+        self.module_class = module_class
+        self.size = size
+        self._ready = deque()
+        self._filling = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Remove a standby object from the pool.
+
+        Returns whether one was available and the object itself
+        """
+        with self._lock:
+            if len(self._ready) == 0:
+                return False, None
+            return True, self._ready.popleft()
+
+    def claim_missing(self):
+        """Return how many standby objects must be built to fill the pool.
+
+        The caller is expected to call fill_one that many times
+        """
+        with self._lock:
+            missing = self.size - len(self._ready) - self._filling
+            if missing <= 0:
+                return 0
+            self._filling += missing
+            return missing
+
+    def fill_one(self):
+        """Build a standby object and add it to the pool."""
+        try:
+            standby = self.module_class.module_standby()
+        finally:
+            with self._lock:
+                self._filling -= 1
+
+        with self._lock:
+            if len(self._ready) < self.size:
+                self._ready.append(standby)
+
+    def get_status(self):
+        """Return the configured size and the number of ready objects."""
+        with self._lock:
+            return {'size': self.size,
+                    'ready': len(self._ready)}
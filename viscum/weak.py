@@ -0,0 +1,84 @@
+"""Weakly referenced callbacks."""
+
+import weakref
+
+
+class WeakCallback(object):
+    """Callback that does not keep its target alive.
+
+    Bound methods are referenced through their instance, so registering
+    one does not keep the plugin instance alive.
+    """
+
+    def __init__(self, callback):
+        """Initialize.
+
+        Args
+        ----
+        callback: function
+            Function or bound method
+        """
+        if hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+            self._ref = weakref.WeakMethod(callback)
+        else:
+            self._ref = weakref.ref(callback)
+
+    def __repr__(self):
+        """Get representation."""
+        return '<WeakCallback to {}>'.format(self._ref())
+
+    def __eq__(self, other):
+        """Compare referenced callbacks.
+
+        Args
+        ----
+        other: object
+            Other callback
+        """
+        return isinstance(other, WeakCallback) and self._ref == other._ref
+
+    def __ne__(self, other):
+        """Compare referenced callbacks.
+
+        Args
+        ----
+        other: object
+            Other callback
+        """
+        return not self == other
+
+    def __hash__(self):
+        """Hash the referenced callback."""
+        return hash(self._ref)
+
+    def __call__(self, *args, **kwargs):
+        """Call the referenced callback.
+
+        Args
+        ----
+        args: list
+            Positional arguments
+        kwargs: dict
+            Keyword arguments
+        """
+        callback = self._ref()
+        if callback is None:
+            raise ReferenceError('callback no longer exists')
+
+        return callback(*args, **kwargs)
+
+    @property
+    def dead(self):
+        """Whether the referenced callback was garbage collected."""
+        return self._ref() is None
+
+
+def is_dead(callback):
+    """Tell whether a registered callback was garbage collected.
+
+    Args
+    ----
+    callback: function, WeakCallback
+        Registered callback
+    """
+    return isinstance(callback, WeakCallback) and callback.dead